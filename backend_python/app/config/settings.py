@@ -4,7 +4,7 @@ Centralized configuration for the FastAPI backend application
 """
 
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 
 class Settings(BaseSettings):
@@ -33,6 +33,54 @@ class Settings(BaseSettings):
     genai_model: str = "gemini-3-pro-preview"
     default_file_search_store: str = "default-file-search-store"
     
+    # Code catalog snapshot (precompiled catalog + indexes, rebuilt when chunk files change)
+    code_snapshot_enabled: bool = True
+    code_snapshot_path: Optional[str] = None  # Defaults to data/codes_chunks/catalog.snapshot
+    
+    # Code catalog storage: "dict" keeps one dict per code, "compact" uses columnar storage
+    # (interned strings, offset arrays, metadata decoded on access) for a much smaller footprint,
+    # "shared" builds the compact catalog once into a file that every worker maps read-only
+    code_storage_mode: Literal["dict", "compact", "shared"] = "dict"
+    code_shared_path: Optional[str] = None  # Defaults to data/codes_chunks/catalog.shared
+    
+    # "lazy" loads only a code -> chunk map at startup and parses chunks on first access,
+    # keeping at most code_lazy_resident_chunks in memory (list/search/export promote to a full load).
+    # 0 keeps every chunk once parsed: fast startup, memory grows only with the chunks actually used.
+    # A cap below the chunk count bounds memory, but random lookups then re-parse evicted chunks
+    # (with 2 of 14 resident, most lookups re-parse a multi-MB chunk - slower overall than an eager load).
+    code_load_mode: Literal["eager", "lazy"] = "eager"
+    code_lazy_resident_chunks: int = 0
+    
+    # Poll data/codes_chunks every N seconds and hot-reload changed chunks (0 disables the watcher)
+    code_reload_interval_seconds: float = 0
+    
+    # Other code catalog versions (e.g. prior code years) loaded next to data/codes_chunks:
+    # one subdirectory per version holding its own manifest.json and chunks, named after the version.
+    # A version is effective from its manifest's effectiveDate, or January 1st when its name is a year.
+    code_versions_path: Optional[str] = None  # Defaults to data/code_versions
+    code_current_version: str = "2025"  # Version name of data/codes_chunks
+    
+    # Processes used to parse and index code chunks on a cold start (0 = CPU count, 1 = in-process)
+    code_load_workers: int = 0
+    
+    # Token required in the X-Admin-Token header by admin endpoints (unset = admin endpoints disabled)
+    admin_token: Optional[str] = None
+    
+    # Most codes accepted by POST /api/codes/batch in one request
+    code_batch_max: int = 5000
+    
+    # Rendered code summary/detail LRU cache (entries per cache, 0 disables)
+    code_render_cache_size: int = 10000
+    
+    # Most scenarios accepted by POST /api/reimbursement/scenarios/batch in one request
+    scenario_batch_max: int = 10000
+    
+    # Most cells (device costs x DRGs / APCs) computed by one NTAP or TPT batch calculation
+    payment_grid_max_cells: int = 100000
+    
+    # Most products accepted by POST /api/ntap/eligibility/batch and /api/tpt/eligibility/batch
+    eligibility_batch_max: int = 5000
+    
     # Reimbursement classification thresholds
     profitable_min_margin: float = 0.10  # Margin > 10% of total = profitable
     break_even_min_margin: float = -0.05  # Margin between -5% and 10% = break-even
@@ -48,6 +96,9 @@ class Settings(BaseSettings):
     ntap_max_cap: float = 150000
     ntap_cost_threshold_multiplier: float = 1.0
     
+    # Synonyms of the NTAP substantial clinical improvement categories ({category: [phrase, ...]})
+    clinical_synonyms_path: Optional[str] = None  # Defaults to data/clinical_improvement_synonyms.json
+    
     # TPT configuration
     tpt_max_pass_through_duration: int = 3  # years
     
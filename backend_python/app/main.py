@@ -3,6 +3,7 @@ FastAPI Application Main Entry Point
 Reimbursement Intelligence Module - Python Backend Server
 """
 
+import asyncio
 import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
@@ -10,13 +11,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import settings, validate_config
-from app.services import code_service, genai_service
+from app.services import code_service, genai_service, reference_data
 from app.routers import (
     health_router,
     codes_router,
     reimbursement_router,
     ntap_router,
     tpt_router,
+    technologies_router,
     files_router,
     upload_router,
     chat_router,
@@ -45,6 +47,13 @@ async def lifespan(app: FastAPI):
     except Exception as error:
         print(f"✗ Failed to initialize code service: {error}")
     
+    # Load NTAP/TPT reference data and its lookup indexes
+    try:
+        reference_data.load()
+        print("✓ Reference data initialized")
+    except Exception as error:
+        print(f"✗ Failed to load reference data: {error}")
+    
     # Initialize GenAI service
     try:
         genai_initialized = await genai_service.initialize()
@@ -55,12 +64,20 @@ async def lifespan(app: FastAPI):
     except Exception as error:
         print(f"✗ Failed to initialize GenAI service: {error}")
     
+    # Watch code chunks for hot reload
+    watcher = None
+    if settings.code_reload_interval_seconds > 0:
+        watcher = asyncio.create_task(code_service.watch_chunks(settings.code_reload_interval_seconds))
+        print(f"✓ Watching code chunks every {settings.code_reload_interval_seconds}s")
+    
     print("=" * 50)
     
     yield
     
     # Shutdown
     print("Shutting down...")
+    if watcher:
+        watcher.cancel()
 
 
 # Create FastAPI application
@@ -123,6 +140,7 @@ app.include_router(codes_router, prefix="/api")
 app.include_router(reimbursement_router, prefix="/api")
 app.include_router(ntap_router, prefix="/api")
 app.include_router(tpt_router, prefix="/api")
+app.include_router(technologies_router, prefix="/api")
 app.include_router(files_router, prefix="/api")
 app.include_router(upload_router, prefix="/api")
 app.include_router(chat_router, prefix="/api")
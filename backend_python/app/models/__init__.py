@@ -1,5 +1,6 @@
 from .code import Code, CodeSummary, CodeDetail, CodePayments, APC_RATES
 from .reimbursement import ReimbursementScenario, SITES_OF_SERVICE, Classification
+from .technology import NtapTechnology, TptTechnology, NtapProgram, TptProgram, Amount
 
 __all__ = [
     "Code",
@@ -10,5 +11,10 @@ __all__ = [
     "ReimbursementScenario",
     "SITES_OF_SERVICE",
     "Classification",
+    "NtapTechnology",
+    "TptTechnology",
+    "NtapProgram",
+    "TptProgram",
+    "Amount",
 ]
 
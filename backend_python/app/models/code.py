@@ -225,9 +225,10 @@ class Code:
             "labels": self.labels,
         }
     
-    def to_detail(self) -> Dict[str, Any]:
-        """Convert to detail format (for single code view)"""
-        payments = self.calculate_payments()
+    def to_detail(self, payments: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Convert to detail format (for single code view); payments may be passed in precomputed"""
+        if payments is None:
+            payments = self.calculate_payments()
         metadata = self.extract_metadata()
         
         return {
@@ -248,9 +249,10 @@ class Code:
             "rawMetadata": self.metadata,
         }
     
-    def get_payment_for_site(self, site_of_service: str) -> float:
-        """Get payment for specific site of service"""
-        payments = self.calculate_payments()
+    def get_payment_for_site(self, site_of_service: str, payments: Optional[Dict[str, float]] = None) -> float:
+        """Get payment for specific site of service; payments may be passed in precomputed"""
+        if payments is None:
+            payments = self.calculate_payments()
         site_map = {
             "IPPS": "IPPS",
             "INPATIENT": "IPPS",
@@ -6,6 +6,7 @@ Represents a reimbursement calculation scenario
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
 from enum import Enum
+from functools import lru_cache
 import re
 from app.config import settings
 
@@ -42,6 +43,22 @@ SITE_MAPPING = {
     "PHYSICIAN": SITES_OF_SERVICE["OBL"],
 }
 
+_NON_LETTERS = re.compile(r'[^A-Z]')
+
+# Exact site inputs resolved without normalizing: every mapping key as sent in upper, lower and title case
+SITE_LOOKUP = {
+    spelling: site
+    for key, site in SITE_MAPPING.items()
+    for spelling in (key, key.lower(), key.title())
+    if _NON_LETTERS.sub('', key) == key
+}
+
+
+@lru_cache(maxsize=1024)
+def _normalize_site_input(site: str) -> Optional[Dict[str, str]]:
+    """Strip a free-form site input down to its letters and map it (memoized per distinct input)"""
+    return SITE_MAPPING.get(_NON_LETTERS.sub('', site.upper()))
+
 
 class Classification(str, Enum):
     PROFITABLE = "profitable"
@@ -60,6 +77,8 @@ class ScenarioRequest(BaseModel):
 class ReimbursementScenario:
     """ReimbursementScenario model class"""
     
+    __slots__ = ("code", "site_of_service", "device_cost", "ntap_add_on", "code_detail", "_site_info", "_results")
+    
     def __init__(
         self,
         code: str,
@@ -90,10 +109,17 @@ class ReimbursementScenario:
     
     def _normalize_site(self, site: str) -> Optional[Dict[str, str]]:
         """Normalize site of service input"""
+        return self.normalize_site(site)
+    
+    @staticmethod
+    def normalize_site(site: str) -> Optional[Dict[str, str]]:
+        """Map a site of service input (e.g. "opps", "Office") to its site definition"""
         if not site:
             return None
-        key = re.sub(r'[^A-Z]', '', site.upper())
-        return SITE_MAPPING.get(key)
+        site_info = SITE_LOOKUP.get(site)
+        if site_info is None:
+            site_info = _normalize_site_input(site)
+        return site_info
     
     @property
     def site_info(self) -> Optional[Dict[str, str]]:
@@ -112,8 +138,7 @@ class ReimbursementScenario:
         if not self.site_of_service or not isinstance(self.site_of_service, str):
             errors.append("Site of service is required and must be a string")
         else:
-            normalized_site = self._normalize_site(self.site_of_service)
-            if not normalized_site:
+            if not self.site_info:
                 valid_sites = ", ".join(SITES_OF_SERVICE.keys())
                 errors.append(f"Invalid site of service: {self.site_of_service}. Valid options: {valid_sites}")
         
@@ -169,55 +194,83 @@ class ReimbursementScenario:
         
         return self._results
     
-    def to_response(self) -> Dict[str, Any]:
-        """Convert to response format"""
-        if not self._results or not self.code_detail:
+    def to_response(self, include_breakdown: bool = True) -> Dict[str, Any]:
+        """Convert to response format (the labelled breakdown and code details only when include_breakdown)"""
+        results = self._results
+        code_detail = self.code_detail
+        if not results or not code_detail:
             raise ValueError("Scenario must be calculated before converting to response")
         
-        return {
-            "code": self.code_detail.get("code"),
-            "description": self.code_detail.get("description"),
-            "siteOfService": self.site_info["name"],
-            "siteKey": self.site_info["key"],
-            "basePayment": self._results["base_payment"],
-            "addOnPayment": self._results["add_on_payment"],
-            "totalPayment": self._results["total_payment"],
+        site_info = self.site_info
+        response = {
+            "code": code_detail.get("code"),
+            "description": code_detail.get("description"),
+            "siteOfService": site_info["name"],
+            "siteKey": site_info["key"],
+            "basePayment": results["base_payment"],
+            "addOnPayment": results["add_on_payment"],
+            "totalPayment": results["total_payment"],
             "deviceCost": self.device_cost,
-            "margin": self._results["margin"],
-            "marginPercentage": f"{self._results['margin_percentage']:.1f}",
-            "classification": self._results["classification"],
-            "breakdown": {
-                "basePayment": {
-                    "label": "Base Payment",
-                    "value": self._results["base_payment"],
-                    "source": f"{self.code_detail.get('code')} @ {self.site_info['name']}",
-                },
-                "addOnPayment": {
-                    "label": "NTAP Add-On",
-                    "value": self._results["add_on_payment"],
-                    "source": "New Technology Add-on Payment" if self._results["add_on_payment"] > 0 else "Not applied",
-                },
-                "totalPayment": {
-                    "label": "Total Payment",
-                    "value": self._results["total_payment"],
-                    "formula": "Base + Add-On",
-                },
-                "deviceCost": {
-                    "label": "Device Cost",
-                    "value": self.device_cost,
-                    "source": "User provided",
-                },
-                "margin": {
-                    "label": "Margin",
-                    "value": self._results["margin"],
-                    "formula": "Total Payment - Device Cost",
-                },
+            "margin": results["margin"],
+            "marginPercentage": f"{results['margin_percentage']:.1f}",
+            "classification": results["classification"],
+        }
+        
+        if include_breakdown:
+            response["breakdown"] = self.build_breakdown(
+                response["code"],
+                site_info["name"],
+                results["base_payment"],
+                results["add_on_payment"],
+                results["total_payment"],
+                self.device_cost,
+                results["margin"],
+            )
+            response["codeDetails"] = {
+                "type": code_detail.get("type"),
+                "category": code_detail.get("category"),
+                "allPayments": code_detail.get("payments"),
+                "apc": code_detail.get("optional", {}).get("apc"),
+            }
+        
+        return response
+    
+    @staticmethod
+    def build_breakdown(
+        code: Optional[str],
+        site_name: str,
+        base_payment: float,
+        add_on_payment: float,
+        total_payment: float,
+        device_cost: float,
+        margin: float
+    ) -> Dict[str, Dict[str, Any]]:
+        """Build the labelled payment breakdown of a calculated scenario"""
+        return {
+            "basePayment": {
+                "label": "Base Payment",
+                "value": base_payment,
+                "source": f"{code} @ {site_name}",
+            },
+            "addOnPayment": {
+                "label": "NTAP Add-On",
+                "value": add_on_payment,
+                "source": "New Technology Add-on Payment" if add_on_payment > 0 else "Not applied",
+            },
+            "totalPayment": {
+                "label": "Total Payment",
+                "value": total_payment,
+                "formula": "Base + Add-On",
+            },
+            "deviceCost": {
+                "label": "Device Cost",
+                "value": device_cost,
+                "source": "User provided",
             },
-            "codeDetails": {
-                "type": self.code_detail.get("type"),
-                "category": self.code_detail.get("category"),
-                "allPayments": self.code_detail.get("payments"),
-                "apc": self.code_detail.get("optional", {}).get("apc"),
+            "margin": {
+                "label": "Margin",
+                "value": margin,
+                "formula": "Total Payment - Device Cost",
             },
         }
     
@@ -0,0 +1,93 @@
+"""
+Technology Domain Models
+Approved NTAP and TPT technologies and the program reference data they are published with
+"""
+
+from typing import Annotated, Optional, Dict, List, Union
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# JSON numbers keep their int/float form so records serialize exactly as published
+Number = Union[int, float]
+
+# Dollar amount accepted in NTAP/TPT batch requests (finite, so grid results fit in integers)
+Amount = Annotated[float, Field(ge=0, le=1e12, allow_inf_nan=False)]
+
+
+class ClinicalImprovement(BaseModel):
+    """Substantial clinical improvement claim of an NTAP technology"""
+    model_config = ConfigDict(extra="allow")
+    
+    category: Optional[str] = None
+    description: Optional[str] = None
+    clinicalTrials: List[str] = []
+
+
+class NtapTechnology(BaseModel):
+    """Technology approved for a New Technology Add-on Payment"""
+    model_config = ConfigDict(extra="allow")
+    
+    id: str
+    name: str
+    manufacturer: Optional[str] = None
+    description: Optional[str] = None
+    fdaApprovalDate: Optional[str] = None
+    fdaApprovalType: Optional[str] = None
+    fdaNumber: Optional[str] = None
+    ntapEffectiveDate: Optional[str] = None
+    ntapExpirationDate: Optional[str] = None
+    applicableDRGs: List[str] = []
+    indicatedProcedures: List[str] = []
+    deviceCost: Optional[Number] = None
+    maxNtapPayment: Optional[Number] = None
+    costThreshold: Optional[Number] = None
+    clinicalImprovement: Optional[ClinicalImprovement] = None
+    status: Optional[str] = None
+
+
+class TptTechnology(BaseModel):
+    """Device, drug or biological approved for Transitional Pass-Through payment"""
+    model_config = ConfigDict(extra="allow")
+    
+    id: str
+    name: str
+    manufacturer: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    fdaApprovalDate: Optional[str] = None
+    fdaApprovalType: Optional[str] = None
+    fdaNumber: Optional[str] = None
+    tptEffectiveDate: Optional[str] = None
+    tptExpirationDate: Optional[str] = None
+    applicableAPCs: List[str] = []
+    indicatedProcedures: List[str] = []
+    hcpcsCode: Optional[str] = None
+    deviceCost: Optional[Number] = None
+    packagedPayment: Optional[Number] = None
+    passThroughPayment: Optional[Number] = None
+    clinicalBenefit: Optional[str] = None
+    status: Optional[str] = None
+
+
+class NtapProgram(BaseModel):
+    """NTAP reference data for a fiscal year (data/ntap_approved.json)"""
+    model_config = ConfigDict(extra="allow")
+    
+    fiscalYear: Optional[str] = None
+    lastUpdated: Optional[str] = None
+    ntapPercentage: Optional[Number] = None
+    maxNtapCap: Optional[Number] = None
+    costThresholdMultiplier: Optional[Number] = None
+    technologies: List[NtapTechnology] = []
+    drgBasePayments: Dict[str, Number] = {}
+
+
+class TptProgram(BaseModel):
+    """TPT reference data for a calendar year (data/tpt_approved.json)"""
+    model_config = ConfigDict(extra="allow")
+    
+    fiscalYear: Optional[str] = None
+    lastUpdated: Optional[str] = None
+    maxPassThroughDuration: Optional[int] = None
+    technologies: List[TptTechnology] = []
+    apcBasePayments: Dict[str, Number] = {}
@@ -3,6 +3,7 @@ from .codes import router as codes_router
 from .reimbursement import router as reimbursement_router
 from .ntap import router as ntap_router
 from .tpt import router as tpt_router
+from .technologies import router as technologies_router
 from .files import router as files_router, upload_router
 from .chat import router as chat_router
 
@@ -12,6 +13,7 @@ __all__ = [
     "reimbursement_router",
     "ntap_router",
     "tpt_router",
+    "technologies_router",
     "files_router",
     "upload_router",
     "chat_router",
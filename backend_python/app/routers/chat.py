@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import re
 
-from app.services import genai_service, code_service
+from app.services import genai_service, code_service, reference_data
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
@@ -84,6 +84,15 @@ def get_code_context(codes):
     return context
 
 
+def get_technology_context(codes):
+    """Get approved NTAP/TPT technologies indicated for the referenced codes"""
+    technologies = {}
+    for code in codes:
+        for technology in reference_data.technologies_for_code(code):
+            technologies.setdefault(technology.id, reference_data.to_reference(technology))
+    return list(technologies.values())
+
+
 @router.post("")
 async def process_chat(request: ChatRequest):
     """
@@ -102,7 +111,9 @@ async def process_chat(request: ChatRequest):
     try:
         # Extract code references from message
         code_refs = extract_code_references(message)
+        await code_service.preload_codes(code_refs)
         code_context = get_code_context(code_refs)
+        technology_context = get_technology_context(code_refs)
         
         # Build additional context from code database
         additional_context = ""
@@ -113,6 +124,10 @@ async def process_chat(request: ChatRequest):
                 if ctx.get('payments'):
                     payments = ctx['payments']
                     additional_context += f"  Payments: IPPS=${payments.get('IPPS', 0):,}, HOPD=${payments.get('HOPD', 0):,}, ASC=${payments.get('ASC', 0):,}, OBL=${payments.get('OBL', 0):,}\n"
+        if technology_context:
+            additional_context += "\n\nApproved New Technologies:\n"
+            for tech in technology_context:
+                additional_context += f"- {tech['name']} ({tech['manufacturer']}): {tech['program']} approved\n"
         
         # Generate response using GenAI
         result = await genai_service.generate_chat_response(
@@ -137,6 +152,8 @@ async def process_chat(request: ChatRequest):
         # Add code context if present
         if code_context:
             response["codeContext"] = code_context
+        if technology_context:
+            response["technologyContext"] = technology_context
         
         # Add file search / web search flags
         response["hasFileSearch"] = result.get("hasFileSearch", False)
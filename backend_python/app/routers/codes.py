@@ -3,33 +3,68 @@ Code Router
 Handles medical code lookup and search operations
 """
 
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Query
+import hmac
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
-from app.services import code_service
+from app.config import settings
+from app.services import code_service, CodeService
 
 router = APIRouter(prefix="/codes", tags=["Codes"])
 
 
+class BatchLookupRequest(BaseModel):
+    """Request model for batch code lookup"""
+    codes: List[str]
+
+
+VERSION_QUERY = Query(None, description="Code catalog version, e.g. 2024 (defaults to the current catalog)")
+AS_OF_QUERY = Query(None, description="Use the catalog version in effect on this date (YYYY-MM-DD)")
+
+
+def select_catalog_version(response: Response, version: Optional[str], as_of: Optional[date]) -> CodeService:
+    """Resolve the version / asOf query parameters to a catalog version and name it in X-Code-Catalog-Version"""
+    try:
+        service = code_service.get_version(version, as_of.isoformat() if as_of else None)
+    except LookupError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    
+    response.headers["X-Code-Catalog-Version"] = service.version
+    return service
+
+
 @router.get("")
 async def get_codes(
+    response: Response,
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
     type: Optional[str] = None,
     sortBy: str = Query("code"),
-    sortOrder: str = Query("asc", pattern="^(asc|desc)$")
+    sortOrder: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page (replaces offset)"),
+    version: Optional[str] = VERSION_QUERY,
+    asOf: Optional[date] = AS_OF_QUERY
 ):
     """
     Get all codes with pagination and filtering
     GET /api/codes
     """
-    result = code_service.get_all_codes(
-        limit=limit,
-        offset=offset,
-        code_type=type,
-        sort_by=sortBy,
-        sort_order=sortOrder,
-    )
+    service = select_catalog_version(response, version, asOf)
+    await service.ensure_full_catalog()
+    try:
+        result = service.get_all_codes(
+            limit=limit,
+            offset=offset,
+            code_type=type,
+            sort_by=sortBy,
+            sort_order=sortOrder,
+            cursor=cursor,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
     
     return {
         "data": result["codes"],
@@ -39,6 +74,7 @@ async def get_codes(
         "page": (result["offset"] // result["limit"]) + 1,
         "totalPages": (result["total"] + result["limit"] - 1) // result["limit"],
         "hasMore": result["hasMore"],
+        "nextCursor": result["nextCursor"],
     }
 
 
@@ -60,6 +96,7 @@ async def search_codes(
             "message": "Query must be at least 2 characters",
         }
     
+    await code_service.ensure_full_catalog()
     result = code_service.search_codes(
         query=q,
         limit=limit,
@@ -73,6 +110,105 @@ async def search_codes(
     }
 
 
+@router.get("/autocomplete")
+async def autocomplete_codes(
+    prefix: str = Query(..., min_length=1, description="Code prefix, e.g. J95"),
+    limit: int = Query(10, ge=1, le=100),
+    type: Optional[str] = None
+):
+    """
+    Autocomplete codes by prefix
+    GET /api/codes/autocomplete
+    """
+    await code_service.ensure_full_catalog()
+    result = code_service.autocomplete(
+        prefix=prefix,
+        limit=limit,
+        code_type=type,
+    )
+    
+    return {
+        "data": result["codes"],
+        "total": len(result["codes"]),
+        "prefix": result["prefix"],
+    }
+
+
+@router.get("/export")
+async def export_codes(
+    type: Optional[str] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    chunkSize: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Stream the full code catalog as NDJSON (default) or CSV
+    GET /api/codes/export
+    """
+    await code_service.ensure_full_catalog()
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    
+    return StreamingResponse(
+        code_service.iter_export(code_type=type, export_format=format, chunk_size=chunkSize),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="codes.{format}"'},
+    )
+
+
+@router.post("/batch")
+async def get_codes_batch(
+    request: BatchLookupRequest,
+    response: Response,
+    version: Optional[str] = VERSION_QUERY,
+    asOf: Optional[date] = AS_OF_QUERY
+):
+    """
+    Get details for many codes in one request
+    POST /api/codes/batch
+    """
+    if len(request.codes) > settings.code_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many codes: {len(request.codes)} (at most {settings.code_batch_max} per request)",
+        )
+    
+    service = select_catalog_version(response, version, asOf)
+    await service.preload_codes(request.codes)
+    result = service.get_codes_batch(request.codes)
+    
+    return {
+        "data": result["codes"],
+        "total": len(result["codes"]),
+        "requested": result["requested"],
+        "notFound": result["notFound"],
+    }
+
+
+@router.post("/admin/reload")
+async def reload_codes(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reload added or changed code chunks without a restart
+    POST /api/codes/admin/reload
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (no admin token configured)")
+    if not hmac.compare_digest(x_admin_token or "", settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    try:
+        return await code_service.reload_codes()
+    except Exception as error:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {error}")
+
+
+@router.get("/versions")
+async def get_code_versions():
+    """
+    List the loaded code catalog versions
+    GET /api/codes/versions
+    """
+    return {"versions": code_service.get_versions()}
+
+
 @router.get("/stats")
 async def get_code_stats():
     """
@@ -83,12 +219,19 @@ async def get_code_stats():
 
 
 @router.get("/{code}")
-async def get_code_by_code(code: str):
+async def get_code_by_code(
+    code: str,
+    response: Response,
+    version: Optional[str] = VERSION_QUERY,
+    asOf: Optional[date] = AS_OF_QUERY
+):
     """
     Get single code by code string
     GET /api/codes/:code
     """
-    code_detail = code_service.get_code(code)
+    service = select_catalog_version(response, version, asOf)
+    await service.preload_codes([code])
+    code_detail = service.get_code(code)
     
     if not code_detail:
         raise HTTPException(status_code=404, detail=f"Code not found: {code}")
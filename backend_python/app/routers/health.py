@@ -27,6 +27,7 @@ async def get_health():
         "googleGenAI": genai_service.get_status(),
         "codeService": {
             "isReady": code_service.is_ready(),
+            "degraded": code_service.is_degraded(),
             "stats": code_service.get_stats() if code_service.is_ready() else None,
         },
     }
@@ -3,15 +3,23 @@ NTAP Router
 Handles New Technology Add-on Payment operations
 """
 
+import asyncio
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from app.config import settings
+from app.models import Amount
 from app.services import (
     calculate_ntap_payment,
+    calculate_ntap_payment_grid,
     check_ntap_eligibility,
+    match_clinical_improvements,
     get_approved_ntap_technologies,
     generate_ntap_application,
+    screen_portfolio,
+    iter_screen_portfolio,
     get_available_drgs,
 )
 
@@ -25,6 +33,14 @@ class NtapCalculateRequest(BaseModel):
     drgPayment: Optional[float] = None
 
 
+class NtapBatchCalculateRequest(BaseModel):
+    """Request model for NTAP calculation over device costs x DRGs"""
+    deviceCosts: List[Amount] = []
+    drgCodes: List[str] = []
+    drgPayments: List[Amount] = []
+    technologyId: Optional[str] = None
+
+
 class NtapEligibilityRequest(BaseModel):
     """Request model for NTAP eligibility check"""
     deviceName: str
@@ -36,6 +52,16 @@ class NtapEligibilityRequest(BaseModel):
     clinicalImprovements: List[str] = []
 
 
+class NtapEligibilityBatchRequest(BaseModel):
+    """Request model for an NTAP eligibility screen of many products"""
+    products: List[NtapEligibilityRequest]
+
+
+class ClinicalImprovementMatchRequest(BaseModel):
+    """Request model for matching clinical improvement claims"""
+    claims: List[str]
+
+
 class NtapApplicationRequest(BaseModel):
     """Request model for NTAP application generation"""
     deviceName: str
@@ -74,6 +100,19 @@ async def calculate_payment(request: NtapCalculateRequest):
     return result
 
 
+@router.post("/calculate/batch")
+async def calculate_payment_batch(request: NtapBatchCalculateRequest):
+    """
+    Calculate NTAP payments for every device cost x DRG pair, returned as a grid
+    POST /api/ntap/calculate/batch
+    """
+    result = calculate_ntap_payment_grid(request.model_dump())
+    if result.get("error"):
+        raise HTTPException(status_code=400, detail=result["message"])
+    
+    return result
+
+
 @router.post("/eligibility")
 async def check_eligibility(request: NtapEligibilityRequest):
     """
@@ -96,6 +135,44 @@ async def check_eligibility(request: NtapEligibilityRequest):
     return result
 
 
+@router.post("/eligibility/batch")
+async def check_eligibility_batch(
+    request: NtapEligibilityBatchRequest,
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
+    """
+    Check NTAP eligibility of a product portfolio: per-product results plus a summary, or NDJSON lines
+    POST /api/ntap/eligibility/batch
+    """
+    if len(request.products) > settings.eligibility_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many products: {len(request.products)} (at most {settings.eligibility_batch_max} per request)",
+        )
+    
+    products = [product.model_dump() for product in request.products]
+    if format == "ndjson":
+        return StreamingResponse(iter_screen_portfolio("NTAP", products), media_type="application/x-ndjson")
+    
+    # Screen off the event loop so other requests keep being served
+    return await asyncio.to_thread(screen_portfolio, "NTAP", products)
+
+
+@router.post("/clinical-improvements/match")
+async def match_clinical_improvement_claims(request: ClinicalImprovementMatchRequest):
+    """
+    Match clinical improvement claims against the substantial clinical improvement categories
+    POST /api/ntap/clinical-improvements/match
+    """
+    if len(request.claims) > settings.eligibility_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many claims: {len(request.claims)} (at most {settings.eligibility_batch_max} per request)",
+        )
+    
+    return {"results": match_clinical_improvements(request.claims)}
+
+
 @router.post("/application")
 async def generate_application(request: NtapApplicationRequest):
     """
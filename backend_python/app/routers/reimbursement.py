@@ -3,12 +3,16 @@ Reimbursement Router
 Handles reimbursement scenario calculations
 """
 
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
-from app.services import code_service
+from app.config import settings
 from app.models import ReimbursementScenario
+from app.services import evaluate_scenarios, iter_scenarios, sweep_device_costs
+from app.routers.codes import VERSION_QUERY, AS_OF_QUERY, select_catalog_version
 
 router = APIRouter(prefix="/reimbursement", tags=["Reimbursement"])
 
@@ -21,8 +25,20 @@ class ScenarioRequest(BaseModel):
     ntapAddOn: float = 0
 
 
+class ScenarioBatchRequest(BaseModel):
+    """Request model for a batch of reimbursement scenarios"""
+    scenarios: List[ScenarioRequest]
+    includeBreakdown: bool = False
+
+
 @router.post("/scenario")
-async def calculate_scenario(request: ScenarioRequest):
+async def calculate_scenario(
+    request: ScenarioRequest,
+    response: Response,
+    breakdown: bool = Query(True, description="Include the labelled breakdown and code details"),
+    version: Optional[str] = VERSION_QUERY,
+    asOf: Optional[date] = AS_OF_QUERY
+):
     """
     Calculate reimbursement scenario
     POST /api/reimbursement/scenario
@@ -34,28 +50,189 @@ async def calculate_scenario(request: ScenarioRequest):
     if not validation["valid"]:
         raise HTTPException(status_code=400, detail={"errors": validation["errors"]})
     
-    # Get code details
-    code_detail = code_service.get_code(scenario.code)
+    # Get code details from the requested catalog version
+    service = select_catalog_version(response, version, asOf)
+    await service.preload_codes([scenario.code])
+    code_detail = service.get_code(scenario.code)
     if not code_detail:
         raise HTTPException(status_code=404, detail=f"Code not found: {scenario.code}")
     
     # Calculate scenario
     scenario.calculate(code_detail)
     
-    return scenario.to_response()
+    return scenario.to_response(include_breakdown=breakdown)
+
+
+class SweepRequest(BaseModel):
+    """Request model for a device-cost sensitivity sweep"""
+    codes: List[str]
+    ntapAddOn: float = Field(0, ge=0)
+    minCost: float = Field(0, ge=0)
+    maxCost: Optional[float] = Field(None, ge=0)
+    samples: int = Field(0, ge=0, le=1000)
+
+
+class RankingRequest(BaseModel):
+    """Request model for a site ranking query"""
+    sortBy: str = Field("spread", pattern="^(payment|spread|delta)$")
+    site: Optional[str] = None
+    compareTo: Optional[str] = None
+    bestSite: Optional[str] = None
+    minPayment: Optional[float] = None
+    codes: Optional[List[str]] = None
+    sortOrder: str = Field("desc", pattern="^(asc|desc)$")
+    limit: int = Field(50, ge=1, le=1000)
+
+
+def _site_key(site: Optional[str], field: str) -> Optional[str]:
+    """Normalize an optional site of service field to its site key (400 if it is not a valid site)"""
+    if site is None:
+        return None
+    site_info = ReimbursementScenario.normalize_site(site)
+    if not site_info:
+        raise HTTPException(status_code=400, detail=f"Invalid {field}: {site}")
+    return site_info["key"]
+
+
+@router.post("/scenarios/batch")
+async def calculate_scenarios_batch(
+    request: ScenarioBatchRequest,
+    response: Response,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    version: Optional[str] = VERSION_QUERY,
+    asOf: Optional[date] = AS_OF_QUERY
+):
+    """
+    Calculate many reimbursement scenarios in one pass, returned as columns (json) or streamed one row per line (ndjson)
+    POST /api/reimbursement/scenarios/batch
+    """
+    scenarios = request.scenarios
+    if len(scenarios) > settings.scenario_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many scenarios: {len(scenarios)} (at most {settings.scenario_batch_max} per request)",
+        )
+    
+    service = select_catalog_version(response, version, asOf)
+    await service.preload_codes(scenario.code for scenario in scenarios)
+    arguments = (
+        service,
+        [scenario.code for scenario in scenarios],
+        [scenario.siteOfService for scenario in scenarios],
+        [scenario.deviceCost for scenario in scenarios],
+        [scenario.ntapAddOn for scenario in scenarios],
+    )
+    
+    if format == "ndjson":
+        return StreamingResponse(
+            iter_scenarios(*arguments, include_breakdown=request.includeBreakdown),
+            media_type="application/x-ndjson",
+            headers={"X-Code-Catalog-Version": service.version},
+        )
+    
+    return evaluate_scenarios(*arguments, include_breakdown=request.includeBreakdown)
+
+
+@router.post("/sweep")
+async def sweep_device_costs_by_site(
+    request: SweepRequest,
+    response: Response,
+    version: Optional[str] = VERSION_QUERY,
+    asOf: Optional[date] = AS_OF_QUERY
+):
+    """
+    Break-even and profitability cutover device costs per site, with an optional sampled margin curve
+    POST /api/reimbursement/sweep
+    """
+    if request.samples and request.maxCost is None:
+        raise HTTPException(status_code=400, detail="maxCost is required when samples is set")
+    if request.maxCost is not None and request.maxCost < request.minCost:
+        raise HTTPException(status_code=400, detail="maxCost must not be less than minCost")
+    if len(request.codes) > settings.code_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many codes: {len(request.codes)} (at most {settings.code_batch_max} per request)",
+        )
+    if len(request.codes) * request.samples > settings.scenario_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many curve points: codes x samples must be at most {settings.scenario_batch_max}",
+        )
+    
+    service = select_catalog_version(response, version, asOf)
+    await service.preload_codes(request.codes)
+    return sweep_device_costs(
+        service,
+        request.codes,
+        ntap_add_on=request.ntapAddOn,
+        min_cost=request.minCost,
+        max_cost=request.maxCost or 0,
+        samples=request.samples,
+    )
+
+
+@router.post("/rankings")
+async def rank_sites(
+    request: RankingRequest,
+    response: Response,
+    version: Optional[str] = VERSION_QUERY,
+    asOf: Optional[date] = AS_OF_QUERY
+):
+    """
+    Rank CPT/HCPCS codes by site payment, payment spread across sites, or the delta between two sites
+    POST /api/reimbursement/rankings
+    """
+    site = _site_key(request.site, "site")
+    compare_to = _site_key(request.compareTo, "compareTo")
+    best_site = _site_key(request.bestSite, "bestSite")
+    
+    if site is None and (request.sortBy != "spread" or request.minPayment is not None):
+        raise HTTPException(status_code=400, detail="site is required to sort by payment or delta, or to filter by minPayment")
+    if request.sortBy == "delta" and compare_to is None:
+        raise HTTPException(status_code=400, detail="compareTo is required to sort by delta")
+    if request.codes is not None and len(request.codes) > settings.code_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many codes: {len(request.codes)} (at most {settings.code_batch_max} per request)",
+        )
+    
+    service = select_catalog_version(response, version, asOf)
+    await service.ensure_full_catalog()
+    result = service.rank_sites(
+        sort_by=request.sortBy,
+        site=site,
+        compare_to=compare_to,
+        best_site=best_site,
+        min_payment=request.minPayment,
+        codes=request.codes,
+        descending=request.sortOrder == "desc",
+        limit=request.limit,
+    )
+    
+    return {
+        "data": result["codes"],
+        "total": result["total"],
+        "sortBy": request.sortBy,
+        "notFound": result["notFound"],
+    }
 
 
 @router.get("/compare/{code}")
 async def compare_all_sites(
     code: str,
+    response: Response,
     deviceCost: float = Query(0),
-    ntapAddOn: float = Query(0)
+    ntapAddOn: float = Query(0),
+    version: Optional[str] = VERSION_QUERY,
+    asOf: Optional[date] = AS_OF_QUERY
 ):
     """
     Compare reimbursement across all sites
     GET /api/reimbursement/compare/:code
     """
-    code_detail = code_service.get_code(code)
+    service = select_catalog_version(response, version, asOf)
+    await service.preload_codes([code])
+    code_detail = service.get_code(code)
     if not code_detail:
         raise HTTPException(status_code=404, detail=f"Code not found: {code}")
     
@@ -72,7 +249,7 @@ async def compare_all_sites(
         
         try:
             scenario.calculate(code_detail)
-            result = scenario.to_response()
+            result = scenario.to_response(include_breakdown=False)
             comparisons.append({
                 "site": result["siteOfService"],
                 "siteKey": result["siteKey"],
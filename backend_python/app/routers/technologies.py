@@ -0,0 +1,81 @@
+"""
+Technologies Router
+Handles lookups of approved NTAP/TPT technologies by DRG, APC, procedure code and manufacturer
+"""
+
+from typing import Optional, Sequence
+from fastapi import APIRouter, HTTPException, Query
+
+from app.services import reference_data, ReferenceDataStore
+
+router = APIRouter(prefix="/technologies", tags=["Technologies"])
+
+PROGRAM_QUERY = Query(None, pattern="^(?i:ntap|tpt)$", description="Only technologies of this program (NTAP or TPT)")
+
+
+def _technologies_response(technologies: Sequence, program: Optional[str]) -> dict:
+    """Technologies in published form, optionally restricted to one program"""
+    data = [
+        ReferenceDataStore.to_response(technology)
+        for technology in technologies
+        if not program or ReferenceDataStore.program_of(technology) == program.upper()
+    ]
+    return {"technologies": data, "totalCount": len(data)}
+
+
+@router.get("/by-drg/{drg}")
+async def get_technologies_by_drg(drg: str, program: Optional[str] = PROGRAM_QUERY):
+    """
+    Get approved technologies applicable to a DRG
+    GET /api/technologies/by-drg/:drg
+    """
+    return {"drg": drg, **_technologies_response(reference_data.technologies_for_drg(drg), program)}
+
+
+@router.get("/by-apc/{apc}")
+async def get_technologies_by_apc(apc: str, program: Optional[str] = PROGRAM_QUERY):
+    """
+    Get approved technologies applicable to an APC
+    GET /api/technologies/by-apc/:apc
+    """
+    return {"apc": apc, **_technologies_response(reference_data.technologies_for_apc(apc), program)}
+
+
+@router.get("/by-code/{code}")
+async def get_technologies_by_code(code: str, program: Optional[str] = PROGRAM_QUERY):
+    """
+    Get approved technologies indicated for a procedure code (or billed under a HCPCS code)
+    GET /api/technologies/by-code/:code
+    """
+    return {"code": code, **_technologies_response(reference_data.technologies_for_code(code), program)}
+
+
+@router.get("/by-manufacturer/{manufacturer}")
+async def get_technologies_by_manufacturer(manufacturer: str, program: Optional[str] = PROGRAM_QUERY):
+    """
+    Get approved technologies of a manufacturer
+    GET /api/technologies/by-manufacturer/:manufacturer
+    """
+    return {"manufacturer": manufacturer, **_technologies_response(reference_data.technologies_for_manufacturer(manufacturer), program)}
+
+
+@router.get("/stats")
+async def get_reference_data_stats():
+    """
+    Get reference data statistics
+    GET /api/technologies/stats
+    """
+    return reference_data.get_stats()
+
+
+@router.get("/{technology_id}")
+async def get_technology(technology_id: str):
+    """
+    Get an approved technology by id
+    GET /api/technologies/:id
+    """
+    technology = reference_data.get_technology(technology_id)
+    if not technology:
+        raise HTTPException(status_code=404, detail=f"Technology not found: {technology_id}")
+    
+    return ReferenceDataStore.to_response(technology)
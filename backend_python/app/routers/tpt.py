@@ -3,15 +3,22 @@ TPT Router
 Handles Transitional Pass-Through Payment operations
 """
 
+import asyncio
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from app.config import settings
+from app.models import Amount
 from app.services import (
     calculate_tpt_payment,
+    calculate_tpt_payment_grid,
     check_tpt_eligibility,
     get_approved_tpt_technologies,
     generate_tpt_application,
+    screen_portfolio,
+    iter_screen_portfolio,
     get_available_apcs,
 )
 
@@ -25,6 +32,15 @@ class TptCalculateRequest(BaseModel):
     packagedPayment: Optional[float] = None
 
 
+class TptBatchCalculateRequest(BaseModel):
+    """Request model for TPT calculation over device costs x APCs"""
+    deviceCosts: List[Amount]
+    productNames: List[str] = []
+    apcCodes: List[str] = []
+    packagedPayments: List[Amount] = []
+    includeSummary: bool = False
+
+
 class TptEligibilityRequest(BaseModel):
     """Request model for TPT eligibility check"""
     deviceName: str
@@ -36,6 +52,11 @@ class TptEligibilityRequest(BaseModel):
     category: str = "device"
 
 
+class TptEligibilityBatchRequest(BaseModel):
+    """Request model for a TPT eligibility screen of many products"""
+    products: List[TptEligibilityRequest]
+
+
 class TptApplicationRequest(BaseModel):
     """Request model for TPT application generation"""
     deviceName: str
@@ -74,6 +95,19 @@ async def calculate_payment(request: TptCalculateRequest):
     return result
 
 
+@router.post("/calculate/batch")
+async def calculate_payment_batch(request: TptBatchCalculateRequest):
+    """
+    Calculate TPT payments for every device cost x APC pair, returned as a grid
+    POST /api/tpt/calculate/batch
+    """
+    result = calculate_tpt_payment_grid(request.model_dump())
+    if result.get("error"):
+        raise HTTPException(status_code=400, detail=result["message"])
+    
+    return result
+
+
 @router.post("/eligibility")
 async def check_eligibility(request: TptEligibilityRequest):
     """
@@ -96,6 +130,29 @@ async def check_eligibility(request: TptEligibilityRequest):
     return result
 
 
+@router.post("/eligibility/batch")
+async def check_eligibility_batch(
+    request: TptEligibilityBatchRequest,
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
+    """
+    Check TPT eligibility of a product portfolio: per-product results plus a summary, or NDJSON lines
+    POST /api/tpt/eligibility/batch
+    """
+    if len(request.products) > settings.eligibility_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many products: {len(request.products)} (at most {settings.eligibility_batch_max} per request)",
+        )
+    
+    products = [product.model_dump() for product in request.products]
+    if format == "ndjson":
+        return StreamingResponse(iter_screen_portfolio("TPT", products), media_type="application/x-ndjson")
+    
+    # Screen off the event loop so other requests keep being served
+    return await asyncio.to_thread(screen_portfolio, "TPT", products)
+
+
 @router.post("/application")
 async def generate_application(request: TptApplicationRequest):
     """
@@ -1,32 +1,49 @@
 from .code_service import code_service, CodeService
 from .ntap_tpt_service import (
     calculate_ntap_payment,
+    calculate_ntap_payment_grid,
     check_ntap_eligibility,
+    match_clinical_improvements,
     get_approved_ntap_technologies,
     generate_ntap_application,
     calculate_tpt_payment,
+    calculate_tpt_payment_grid,
     check_tpt_eligibility,
     get_approved_tpt_technologies,
     generate_tpt_application,
     get_available_drgs,
     get_available_apcs,
+    screen_portfolio,
+    iter_screen_portfolio,
 )
+from .reference_data import reference_data, ReferenceDataStore
 from .genai_service import genai_service, GenAIService
+from .scenario_engine import evaluate_scenarios, iter_scenarios, sweep_device_costs
 
 __all__ = [
     "code_service",
     "CodeService",
     "calculate_ntap_payment",
+    "calculate_ntap_payment_grid",
     "check_ntap_eligibility",
+    "match_clinical_improvements",
     "get_approved_ntap_technologies",
     "generate_ntap_application",
     "calculate_tpt_payment",
+    "calculate_tpt_payment_grid",
     "check_tpt_eligibility",
     "get_approved_tpt_technologies",
     "generate_tpt_application",
     "get_available_drgs",
     "get_available_apcs",
+    "screen_portfolio",
+    "iter_screen_portfolio",
+    "reference_data",
+    "ReferenceDataStore",
     "genai_service",
     "GenAIService",
+    "evaluate_scenarios",
+    "iter_scenarios",
+    "sweep_device_costs",
 ]
 
@@ -0,0 +1,78 @@
+"""
+LRU Cache
+Small bounded least-recently-used cache with hit/miss counters
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+
+class LRUCache:
+    """
+    Bounded LRU cache with hit/miss counters.
+    Thread-safe: sync generators run in Starlette's threadpool share it with the event loop.
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+    
+    def keys(self) -> List[Hashable]:
+        """Keys from least to most recently used"""
+        with self._lock:
+            return list(self._entries)
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Get a value and mark it as most recently used"""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or replace a value, evicting the least recently used entries beyond max_size"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove a value without touching the counters"""
+        with self._lock:
+            return self._entries.pop(key, default)
+    
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, len(self._entries)
+        lookups = hits + misses
+        return {
+            "size": size,
+            "maxSize": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hitRate": round(hits / lookups, 4) if lookups else 0,
+        }
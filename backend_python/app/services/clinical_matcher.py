@@ -0,0 +1,170 @@
+"""
+Clinical Improvement Matcher
+Matches free-text clinical improvement claims against the substantial clinical improvement categories.
+
+The category names and their synonyms are compiled once into an Aho-Corasick automaton, so finding
+every phrase in a claim takes one pass over the text. A claim counts as a category claim when a
+phrase occurs in it, or when the whole claim is part of a phrase (e.g. "mortality"); the second case
+is answered from a precomputed set of phrase fragments.
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+
+# Clinical improvement categories accepted as substantial clinical improvement claims
+CLINICAL_IMPROVEMENT_CATEGORIES = (
+    "Reduced mortality",
+    "Reduced complications",
+    "Reduced hospital stay",
+    "Improved patient outcomes",
+    "Reduced readmissions",
+    "Treatment for unmet need",
+)
+
+
+def load_synonyms(path: Path) -> Dict[str, List[str]]:
+    """Read {category: [synonym, ...]} from a JSON file; an absent file means no synonyms"""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        synonyms = json.load(f)
+    if not isinstance(synonyms, dict) or not all(
+        isinstance(phrases, list) and all(isinstance(phrase, str) for phrase in phrases)
+        for phrases in synonyms.values()
+    ):
+        raise ValueError(f"{path.name} must map category names to lists of phrases")
+    return synonyms
+
+
+def _lowered_with_offsets(text: str) -> Tuple[str, Optional[List[int]]]:
+    """
+    Lowercase text, plus the original index of every lowered character when lowercasing
+    changed the length (a few characters lowercase to two); None when indexes line up
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered, None
+    offsets = [index for index, char in enumerate(text) for _ in char.lower()]
+    return lowered, offsets
+
+
+class ClinicalImprovementMatcher:
+    """Aho-Corasick automaton over the lowercased category names and synonyms"""
+    
+    def __init__(self, synonyms: Optional[Dict[str, Iterable[str]]] = None, categories: Iterable[str] = CLINICAL_IMPROVEMENT_CATEGORIES):
+        self.categories: List[str] = list(categories)
+        self.phrases: List[str] = []  # phrase id -> lowercased phrase
+        self.phrase_categories: List[str] = []  # phrase id -> category
+        phrase_ids: Dict[Tuple[str, str], int] = {}
+        
+        for category in self.categories:
+            for phrase in [category, *(synonyms or {}).get(category, [])]:
+                phrase = phrase.strip().lower()
+                if phrase and (phrase, category) not in phrase_ids:
+                    phrase_ids[(phrase, category)] = len(self.phrases)
+                    self.phrases.append(phrase)
+                    self.phrase_categories.append(category)
+        
+        self._build_automaton()
+        
+        # Every substring of every phrase -> categories it is part of (claims contained in a phrase)
+        fragments: Dict[str, Dict[str, None]] = {}
+        for phrase, category in zip(self.phrases, self.phrase_categories):
+            for start in range(len(phrase) + 1):
+                for end in range(start, len(phrase) + 1):
+                    fragments.setdefault(phrase[start:end], {})[category] = None
+        self.fragments: Dict[str, Tuple[str, ...]] = {fragment: tuple(categories) for fragment, categories in fragments.items()}
+    
+    def _build_automaton(self) -> None:
+        """
+        Trie of the phrases with failure links and dictionary (output) links, built breadth-first.
+        Failure links are then folded into a full transition table (characters outside the phrases
+        lead back to the root), so scanning a character is a single dict lookup.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]  # phrase ids ending exactly at a state
+        self._dict_link: List[int] = [-1]  # nearest state on the failure chain with output
+        
+        for phrase_id, phrase in enumerate(self.phrases):
+            state = 0
+            for char in phrase:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._dict_link.append(-1)
+                state = next_state
+            self._output[state].append(phrase_id)
+        
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                failed = self._goto[fallback].get(char, 0)
+                self._fail[child] = failed
+                self._dict_link[child] = failed if self._output[failed] else self._dict_link[failed]
+                queue.append(child)
+        
+        # Transitions in breadth-first order, so each failure state's row is complete before it is used
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in range(len(self._goto) - 1)]
+        self._terminal: List[bool] = [bool(self._output[state]) or self._dict_link[state] > 0 for state in range(len(self._goto))]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            queue.extend(self._goto[state].values())
+    
+    def find(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Every category phrase occurring in text (case-insensitive, overlapping matches included),
+        as {category, phrase, start, end} with [start, end) character spans into text, ordered by end
+        """
+        lowered, offsets = _lowered_with_offsets(text)
+        delta, terminal, output, dict_link = self._delta, self._terminal, self._output, self._dict_link
+        matches = []
+        state = 0
+        for index, char in enumerate(lowered):
+            state = delta[state].get(char, 0)
+            if not terminal[state]:
+                continue
+            
+            hit = state if output[state] else dict_link[state]
+            while hit > 0:
+                for phrase_id in output[hit]:
+                    start = index + 1 - len(self.phrases[phrase_id])
+                    matches.append({
+                        "category": self.phrase_categories[phrase_id],
+                        "phrase": self.phrases[phrase_id],
+                        "start": offsets[start] if offsets else start,
+                        "end": offsets[index] + 1 if offsets else index + 1,
+                    })
+                hit = dict_link[hit]
+        return matches
+    
+    def categories_in(self, claim: str) -> List[str]:
+        """
+        Categories a claim refers to, in category order: those with a phrase in the claim,
+        and those with a phrase that contains the whole claim
+        """
+        matched = dict.fromkeys(match["category"] for match in self.find(claim))
+        matched.update(dict.fromkeys(self.fragments.get(claim.lower(), ())))
+        return [category for category in self.categories if category in matched]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get matcher statistics"""
+        return {
+            "categories": len(self.categories),
+            "phrases": len(self.phrases),
+            "states": len(self._goto),
+            "fragments": len(self.fragments),
+        }
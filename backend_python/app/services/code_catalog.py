@@ -0,0 +1,196 @@
+"""
+Code Catalog
+Holds the loaded medical codes together with the in-memory indexes built over them.
+A catalog is a plain picklable object so it can be snapshotted to disk and swapped as a unit.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from app.services.code_indexes import TokenIndex, CodePrefixIndex, SortOrderCache
+from app.services.code_payments import PaymentTable
+from app.services.code_store import CompactCodeStore, CompactCodeIndex, CompactRecordList
+
+
+def normalize_type(code_type: Optional[str]) -> str:
+    """Normalize type name for consistent querying"""
+    if not code_type:
+        return "OTHER"
+    upper_type = code_type.upper()
+    if upper_type == "DX":
+        return "ICD10"
+    if upper_type == "PCS":
+        return "ICD10-PCS"
+    return upper_type
+
+
+def load_chunk(chunks_dir: Path, chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Read one manifest chunk, verifying it against the manifest entry:
+    sha256 checksum (when listed), record shape and codeCount. Raises ValueError if corrupt.
+    """
+    with open(Path(chunks_dir) / chunk["fileName"], "rb") as f:
+        raw = f.read()
+    
+    expected_sha256 = chunk.get("sha256")
+    if expected_sha256 and hashlib.sha256(raw).hexdigest() != expected_sha256.lower():
+        raise ValueError("sha256 checksum mismatch")
+    
+    codes = json.loads(raw)
+    if not isinstance(codes, list) or not all(isinstance(code_obj, dict) and isinstance(code_obj.get("code"), str) for code_obj in codes):
+        raise ValueError("not a JSON array of code records")
+    
+    if "codeCount" in chunk and len(codes) != chunk["codeCount"]:
+        raise ValueError(f"expected {chunk['codeCount']} codes, found {len(codes)}")
+    
+    return codes
+
+
+def parse_chunk(chunks_dir: str, chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Load and verify one chunk and build its partial (unfinalized) search index.
+    Runs in a worker process; the caller merges chunks in manifest order.
+    """
+    start_time = time.time()
+    codes = load_chunk(Path(chunks_dir), chunk)
+    parsed_time = time.time()
+    
+    search_index = TokenIndex()
+    for code_obj in codes:
+        code = code_obj["code"]
+        search_index.add(code, f"{code} {code_obj.get('description', '')}".lower(), normalize_type(code_obj.get("type")))
+    
+    return {
+        "codes": codes,
+        "searchIndex": search_index,
+        "parseMs": int((parsed_time - start_time) * 1000),
+        "indexMs": int((time.time() - parsed_time) * 1000),
+    }
+
+
+class CodeCatalog:
+    """
+    Loaded codes plus code, type and search indexes.
+    codes is either a list of record dicts or a CompactCodeStore (settings.code_storage_mode = "compact" / "shared").
+    """
+    
+    def __init__(self, codes: Optional[List[Dict[str, Any]]] = None, manifest: Optional[Dict[str, Any]] = None):
+        self.codes: List[Dict[str, Any]] = codes if codes is not None else []
+        self.manifest: Optional[Dict[str, Any]] = manifest  # Manifest info when loading chunks
+        self.code_index: Dict[str, Dict[str, Any]] = {}  # code -> full object
+        self.type_index: Dict[str, List[Dict[str, Any]]] = {}  # type -> [codes]
+        self.search_index: TokenIndex = TokenIndex()  # Inverted index for text search
+        self.prefix_index: CodePrefixIndex = CodePrefixIndex()  # Sorted codes for autocomplete
+        self.sort_orders: SortOrderCache = SortOrderCache()  # Presorted positions for pagination
+        self.payment_table: PaymentTable = PaymentTable()  # Vectorized CPT/HCPCS payments
+        self.chunk_report: Dict[str, Any] = {}  # Manifest chunks that were loaded, missing or corrupt
+        self.chunk_spans: Dict[str, Dict[str, Any]] = {}  # fileName -> manifest entry, file signature, start, count
+    
+    @property
+    def is_compact(self) -> bool:
+        return isinstance(self.codes, CompactCodeStore)
+    
+    @property
+    def is_degraded(self) -> bool:
+        """True when some manifest chunks were missing or corrupt and are not in the catalog"""
+        return bool(self.chunk_report.get("missing") or self.chunk_report.get("corrupt"))
+    
+    @property
+    def storage_mode(self) -> str:
+        """dict, compact, or shared (compact columns mapped from a shared catalog file)"""
+        if not self.is_compact:
+            return "dict"
+        return "shared" if isinstance(self.codes.code_blob, memoryview) else "compact"
+    
+    def share_records(self, base: "CodeCatalog") -> int:
+        """
+        Point records that are identical in another catalog version at that version's objects,
+        so codes unchanged between versions are held in memory once. Returns how many were shared.
+        Only dict storage holds per-record objects; compact catalogs are left as they are.
+        """
+        if self.is_compact or base.is_compact:
+            return 0
+        
+        shared: Dict[int, Dict[str, Any]] = {}  # id of own record -> identical base record
+        for position, code_obj in enumerate(self.codes):
+            base_obj = base.code_index.get(code_obj["code"])
+            if base_obj is not None and base_obj is not code_obj and base_obj == code_obj:
+                shared[id(code_obj)] = base_obj
+                self.codes[position] = base_obj
+        
+        if shared:
+            # The replaced records stay alive (and their ids valid) until the indexes drop them here
+            for code, code_obj in self.code_index.items():
+                if id(code_obj) in shared:
+                    self.code_index[code] = shared[id(code_obj)]
+            for type_name, bucket in self.type_index.items():
+                self.type_index[type_name] = [shared.get(id(code_obj), code_obj) for code_obj in bucket]
+        return len(shared)
+    
+    def build_indexes(self, search_index: Optional[TokenIndex] = None, previous: Optional["CodeCatalog"] = None) -> None:
+        """
+        Build in-memory indexes for fast lookup.
+        search_index: an unfinalized token index already holding every code (e.g. merged from chunks)
+        previous: the catalog being reloaded, whose search vocabulary is reused
+        """
+        print("Building indexes...")
+        
+        compact = self.is_compact
+        code_index: Dict[str, Dict[str, Any]] = {}
+        type_index: Dict[str, List[Dict[str, Any]]] = {}
+        code_positions: Dict[str, int] = {}
+        index_search = search_index is None
+        self.search_index = TokenIndex() if index_search else search_index
+        
+        for position, code_obj in enumerate(self.codes):
+            code = code_obj["code"]
+            code_positions[code] = position
+            code_type = normalize_type(code_obj.get("type"))
+            
+            if not compact:
+                # Index by code
+                code_index[code] = code_obj
+                
+                # Index by type
+                if code_type not in type_index:
+                    type_index[code_type] = []
+                type_index[code_type].append(code_obj)
+            
+            # Build search index (code + description tokens)
+            if index_search:
+                self.search_index.add(
+                    code,
+                    f"{code} {code_obj.get('description', '')}".lower(),
+                    code_type,
+                )
+        
+        self.search_index.finalize(previous.search_index if previous is not None else None)
+        self.prefix_index = CodePrefixIndex()
+        self.prefix_index.build(self.codes, code_positions, self.search_index.types)
+        self.sort_orders = SortOrderCache()
+        self.sort_orders.build(self.codes, self.search_index.types)
+        self.payment_table = PaymentTable.build(self.codes, code_positions, self.search_index.types)
+        
+        if compact:
+            # Compact mode resolves codes and type buckets through the columnar store
+            self.code_index = CompactCodeIndex(self.codes)
+            self.type_index = {
+                code_type: CompactRecordList(self.codes, positions)
+                for code_type, positions in self.sort_orders.type_positions.items()
+                if code_type is not None
+            }
+        else:
+            self.code_index = code_index
+            self.type_index = type_index
+        
+        print("Index stats:")
+        print(f"  - Storage: {'compact' if compact else 'dict'}")
+        print(f"  - Code index size: {len(self.code_index)}")
+        print(f"  - Search vocabulary: {len(self.search_index.vocabulary)} tokens")
+        print(f"  - Payment table: {len(self.payment_table)} codes")
+        print(f"  - Types: {list(self.type_index.keys())}")
+        for type_name, codes in self.type_index.items():
+            print(f"    - {type_name}: {len(codes)} codes")
@@ -0,0 +1,381 @@
+"""
+Code Indexes
+Secondary index structures built over a CodeCatalog for fast querying
+"""
+
+import bisect
+import heapq
+from array import array
+from typing import Any, Dict, List, Iterable, Mapping, Optional, Sequence, Set, Tuple
+
+
+class TokenIndex:
+    """
+    Inverted index over code search text (code + description, lowercased).
+
+    Search text is split on whitespace into tokens; each token maps to a posting list of
+    catalog positions. Partial words are resolved through an n-gram index over the token
+    vocabulary: every 1-3 character substring of a token points at the tokens containing it.
+    """
+    
+    GRAM_SIZE = 3
+    TERM_CACHE_SIZE = 256
+    TERM_CACHE_MAX_POSITIONS = 250000  # total positions held by the term cache
+    TERM_CACHE_MAX_ENTRY = 50000  # terms matching more positions than this are not cached
+    MAX_STALE_RATIO = 0.1
+    
+    def __init__(self):
+        self.postings: Dict[str, array] = {}  # token -> sorted catalog positions
+        self.code_positions: Dict[str, array] = {}  # lowercased code -> catalog positions
+        self.types: List[str] = []  # catalog position -> normalized type
+        self.vocabulary: List[str] = []  # token id -> token (sorted, plus tokens appended on reload)
+        self.grams: Dict[str, array] = {}  # 1..GRAM_SIZE-gram -> token ids containing it
+        self._building: Dict[str, List[int]] = {}
+        self._term_cache: Dict[str, Set[int]] = {}
+        self._term_cache_positions = 0
+    
+    def __len__(self) -> int:
+        return len(self.types)
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_term_cache"] = {}
+        state["_term_cache_positions"] = 0
+        return state
+    
+    def add(self, code: str, search_text: str, code_type: str) -> None:
+        """Add the next catalog entry (positions are assigned in insertion order)"""
+        position = len(self.types)
+        self.types.append(code_type)
+        
+        code_key = code.lower()
+        if code_key not in self.code_positions:
+            self.code_positions[code_key] = array("i")
+        self.code_positions[code_key].append(position)
+        
+        for token in set(search_text.split()):
+            postings = self._building.get(token)
+            if postings is None:
+                self._building[token] = [position]
+            else:
+                postings.append(position)
+    
+    def extend(self, other: "TokenIndex") -> None:
+        """Append the entries of another unfinalized index (e.g. one chunk's) after this index's own"""
+        base = len(self.types)
+        self.types.extend(other.types)
+        
+        for code_key, positions in other.code_positions.items():
+            shifted = array("i", [position + base for position in positions]) if base else positions
+            if code_key in self.code_positions:
+                self.code_positions[code_key].extend(shifted)
+            else:
+                self.code_positions[code_key] = shifted
+        
+        for token, positions in other._building.items():
+            shifted = [position + base for position in positions] if base else positions
+            postings = self._building.get(token)
+            if postings is None:
+                self._building[token] = shifted
+            else:
+                postings.extend(shifted)
+    
+    def extend_from(self, other: "TokenIndex", start: int, end: int) -> None:
+        """
+        Append the entries of a finalized index at positions [start, end), e.g. an unchanged chunk
+        of the previous catalog on reload, without re-tokenizing them. Positions are shifted to follow
+        this index's own; when a chunk keeps its place the posting slices are copied as they are.
+        """
+        delta = len(self.types) - start
+        self.types.extend(other.types[start:end])
+        
+        for source, target in ((other.code_positions, self.code_positions), (other.postings, self._building)):
+            for key, positions in source.items():
+                lo = bisect.bisect_left(positions, start)
+                hi = bisect.bisect_left(positions, end, lo)
+                if lo == hi:
+                    continue
+                block = positions[lo:hi]
+                if delta:
+                    block = array("i", [position + delta for position in block])
+                elif type(block) is not array:
+                    block = array("i", block)  # memoryview over a shared catalog file
+                existing = target.get(key)
+                if existing is None:
+                    target[key] = block if target is self.code_positions else list(block)
+                else:
+                    existing.extend(block)
+    
+    def finalize(self, previous: Optional["TokenIndex"] = None) -> None:
+        """
+        Freeze posting lists and build the n-gram index over the vocabulary.
+        With the previous index of a reloaded catalog, its vocabulary and n-grams are reused and only
+        new tokens are appended (tokens that disappeared stay as harmless entries without postings,
+        until they exceed MAX_STALE_RATIO of the vocabulary and everything is rebuilt).
+        """
+        self.postings = {token: array("i", positions) for token, positions in self._building.items()}
+        self._building = {}
+        self._term_cache = {}
+        self._term_cache_positions = 0
+        
+        # Codes are tokens of their own search text, but index them explicitly so code
+        # substring matching never depends on how the description was tokenized
+        tokens = set(self.postings) | set(self.code_positions)
+        
+        if previous is not None and isinstance(previous.grams, dict) and previous.vocabulary:
+            known = set(previous.vocabulary)
+            if len(known - tokens) <= len(known) * self.MAX_STALE_RATIO:
+                self._extend_grams(previous, sorted(tokens - known))
+                return
+        
+        self.vocabulary = sorted(tokens)
+        grams: Dict[str, List[int]] = {}
+        for token_id, token in enumerate(self.vocabulary):
+            for gram in self._token_grams(token):
+                if gram in grams:
+                    grams[gram].append(token_id)
+                else:
+                    grams[gram] = [token_id]
+        self.grams = {gram: array("i", ids) for gram, ids in grams.items()}
+    
+    def _extend_grams(self, previous: "TokenIndex", new_tokens: List[str]) -> None:
+        """Reuse the previous vocabulary and n-grams, appending new tokens (copy-on-write, previous is left intact)"""
+        self.vocabulary = previous.vocabulary + new_tokens
+        
+        additions: Dict[str, List[int]] = {}
+        for token_id, token in enumerate(new_tokens, start=len(previous.vocabulary)):
+            for gram in self._token_grams(token):
+                if gram in additions:
+                    additions[gram].append(token_id)
+                else:
+                    additions[gram] = [token_id]
+        
+        self.grams = dict(previous.grams)
+        for gram, ids in additions.items():
+            self.grams[gram] = self.grams.get(gram, array("i")) + array("i", ids)
+    
+    def _token_grams(self, token: str) -> Set[str]:
+        """All distinct substrings of a token up to GRAM_SIZE characters"""
+        result = set()
+        length = len(token)
+        for size in range(1, min(self.GRAM_SIZE, length) + 1):
+            for start in range(length - size + 1):
+                result.add(token[start:start + size])
+        return result
+    
+    def tokens_containing(self, term: str) -> List[str]:
+        """Vocabulary tokens that contain term as a substring"""
+        if not term:
+            return []
+        
+        if len(term) <= self.GRAM_SIZE:
+            return [self.vocabulary[token_id] for token_id in self.grams.get(term, ())]
+        
+        # Intersect the token lists of the term's grams, smallest first, then verify
+        gram_lists = []
+        for start in range(len(term) - self.GRAM_SIZE + 1):
+            ids = self.grams.get(term[start:start + self.GRAM_SIZE])
+            if not ids:
+                return []
+            gram_lists.append(ids)
+        gram_lists.sort(key=len)
+        
+        candidates = set(gram_lists[0])
+        for ids in gram_lists[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                return []
+        
+        return [self.vocabulary[token_id] for token_id in candidates if term in self.vocabulary[token_id]]
+    
+    def positions_containing(self, term: str) -> Set[int]:
+        """
+        Catalog positions whose search text contains term as a substring.
+        Results are cached up to TERM_CACHE_SIZE terms and TERM_CACHE_MAX_POSITIONS positions in total;
+        near catalog-wide sets (1-2 character terms) are recomputed instead.
+        """
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+        
+        positions: Set[int] = set()
+        for token in self.tokens_containing(term):
+            postings = self.postings.get(token)
+            if postings is not None:
+                positions.update(postings)
+        
+        if len(positions) > self.TERM_CACHE_MAX_ENTRY:
+            return positions
+        
+        while self._term_cache and (
+            len(self._term_cache) >= self.TERM_CACHE_SIZE
+            or self._term_cache_positions + len(positions) > self.TERM_CACHE_MAX_POSITIONS
+        ):
+            self._term_cache_positions -= len(self._term_cache.pop(next(iter(self._term_cache))))
+        self._term_cache[term] = positions
+        self._term_cache_positions += len(positions)
+        return positions
+    
+    def score(self, search_term: str, terms: Iterable[str]) -> Dict[int, int]:
+        """
+        Score catalog positions for a query using only the posting lists.
+        Same scoring as the original linear scan: 100 for an exact code match,
+        80 when the query is a substring of the code, +10 per query term found in the search text.
+        """
+        scores: Dict[int, int] = {}
+        
+        for token in self.tokens_containing(search_term):
+            for position in self.code_positions.get(token, ()):
+                scores[position] = 80
+        for position in self.code_positions.get(search_term, ()):
+            scores[position] = 100
+        
+        for term in terms:
+            for position in self.positions_containing(term):
+                scores[position] = scores.get(position, 0) + 10
+        
+        return scores
+    
+    def top(self, scores: Dict[int, int], limit: int, code_type: Optional[str] = None) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Total number of matches and the top (position, score) pairs,
+        by score descending and catalog order within equal scores
+        """
+        if code_type:
+            items = [(position, score) for position, score in scores.items() if self.types[position] == code_type]
+        else:
+            items = scores.items()
+        return len(items), heapq.nsmallest(limit, items, key=lambda item: (-item[1], item[0]))
+
+
+class CodePrefixIndex:
+    """Code-sorted permutation arrays for prefix lookups in O(log N + K)"""
+    
+    def __init__(self):
+        self.order = array("i")  # positions of the code_index entries, sorted by uppercased code
+        self.by_type: Dict[str, array] = {}  # normalized type -> sorted positions of that type
+    
+    def build(self, codes: Sequence[Mapping[str, Any]], code_positions: Dict[str, int], types: List[str]) -> None:
+        """Build from code -> catalog position (the entry code_index resolves to)"""
+        self.order = array("i", sorted(code_positions.values(), key=lambda p: (codes[p]["code"].upper(), codes[p]["code"])))
+        
+        grouped: Dict[str, List[int]] = {}
+        for position in self.order:
+            code_type = types[position]
+            if code_type not in grouped:
+                grouped[code_type] = []
+            grouped[code_type].append(position)
+        self.by_type = {code_type: array("i", positions) for code_type, positions in grouped.items()}
+    
+    def lookup(self, codes: Sequence[Mapping[str, Any]], prefix: str, limit: int, code_type: Optional[str] = None) -> List[int]:
+        """Positions of the first `limit` codes (in code order) starting with prefix, case-insensitive"""
+        if code_type:
+            order = self.by_type.get(code_type, array("i"))
+        else:
+            order = self.order
+        
+        prefix = prefix.upper()
+        start = bisect.bisect_left(order, prefix, key=lambda p: codes[p]["code"].upper())
+        end = min(start + limit, len(order))
+        
+        results = []
+        for i in range(start, end):
+            position = order[i]
+            if not codes[position]["code"].upper().startswith(prefix):
+                break
+            results.append(position)
+        return results
+
+
+class SortOrderCache:
+    """
+    Permutation arrays of catalog positions for each (type, sort key, direction).
+    Code order is precomputed at index-build time; other sort keys are built on first
+    use and cached (bounded, since sortBy comes straight from the query string).
+    """
+    
+    PRESORTED = (("code", False), ("code", True))
+    MAX_LAZY_ORDERS = 32
+    
+    def __init__(self):
+        self.type_positions: Dict[Optional[str], array] = {}  # normalized type (None = all) -> positions
+        self._orders: Dict[Tuple[Optional[str], str, bool], array] = {}
+        self._lazy_keys: List[Tuple[Optional[str], str, bool]] = []
+    
+    def build(self, codes: Sequence[Mapping[str, Any]], types: List[str]) -> None:
+        """Group positions by type and precompute the code orderings"""
+        self._orders = {}
+        self._lazy_keys = []
+        
+        grouped: Dict[Optional[str], List[int]] = {None: list(range(len(codes)))}
+        for position, code_type in enumerate(types):
+            if code_type not in grouped:
+                grouped[code_type] = []
+            grouped[code_type].append(position)
+        self.type_positions = {code_type: array("i", positions) for code_type, positions in grouped.items()}
+        
+        for code_type in self.type_positions:
+            for sort_by, descending in self.PRESORTED:
+                key = (code_type, sort_by, descending)
+                self._orders[key] = self._sort(codes, code_type, sort_by, descending)
+    
+    def _sort(self, codes: Sequence[Mapping[str, Any]], code_type: Optional[str], sort_by: str, descending: bool) -> array:
+        """
+        Stable sort of a type's positions, matching list.sort(key=str(field), reverse=...).
+        Non-code keys are sorted from the code-ascending order, so ties are broken by code, then by
+        catalog position, and every ordering is a total order on (value, code, position) that cursors can seek into.
+        """
+        if sort_by == "code":
+            positions = self.type_positions.get(code_type, ())
+        else:
+            positions = self.order(codes, code_type, "code", False)
+        return array("i", sorted(positions, key=lambda p: str(codes[p].get(sort_by, "")), reverse=descending))
+    
+    def order(self, codes: Sequence[Mapping[str, Any]], code_type: Optional[str], sort_by: str, descending: bool) -> array:
+        """Get (building and caching if needed) the ordering for a type, sort key and direction"""
+        key = (code_type, sort_by, descending)
+        order = self._orders.get(key)
+        if order is not None:
+            return order
+        
+        if code_type not in self.type_positions:
+            return array("i")
+        
+        order = self._sort(codes, code_type, sort_by, descending)
+        if len(self._lazy_keys) >= self.MAX_LAZY_ORDERS:
+            self._orders.pop(self._lazy_keys.pop(0), None)
+        self._lazy_keys.append(key)
+        self._orders[key] = order
+        return order
+    
+    def seek(
+        self,
+        codes: Sequence[Mapping[str, Any]],
+        order: array,
+        sort_by: str,
+        descending: bool,
+        after_value: str,
+        after_code: str,
+        after_position: int
+    ) -> int:
+        """
+        Index of the first entry in an ordering that comes after (value, code, position), in O(log N).
+        Codes repeat across types (ICD-10 and HCPCS J9600), so the catalog position breaks the last ties.
+        """
+        def is_after(position: int) -> bool:
+            code_obj = codes[position]
+            value = str(code_obj.get(sort_by, ""))
+            if value == after_value:
+                if code_obj["code"] == after_code:
+                    return position > after_position
+                return code_obj["code"] > after_code
+            return value < after_value if descending else value > after_value
+        
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if is_after(order[mid]):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
@@ -0,0 +1,166 @@
+"""
+Lazy Code Catalog
+On-demand chunk loading for small deployments.
+At startup only a code -> chunk map is loaded (from a sidecar file next to the chunks);
+a chunk is parsed the first time one of its codes is requested, and at most
+settings.code_lazy_resident_chunks chunks are kept in memory (least recently used are evicted).
+A chunk that turns out missing or corrupt when it is first needed is reported in the catalog's
+chunk report (degraded mode) and its codes are treated as not found.
+"""
+
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.services.cache import LRUCache
+from app.services.code_catalog import load_chunk
+from app.services.code_snapshot import SNAPSHOT_VERSION
+
+
+def build_code_map(chunks_dir: Path, chunks: List[Dict[str, Any]]) -> Tuple[Dict[str, int], List[Dict[str, str]]]:
+    """
+    Map every code to the index of the chunk holding it (the last one, like code_index).
+    Chunks that fail verification are left out and returned as [{fileName, reason}].
+    """
+    code_map: Dict[str, int] = {}
+    corrupt: List[Dict[str, str]] = []
+    for chunk_id, chunk in enumerate(chunks):
+        try:
+            codes = load_chunk(chunks_dir, chunk)
+        except (OSError, ValueError) as error:
+            corrupt.append({"fileName": chunk["fileName"], "reason": str(error) or type(error).__name__})
+            continue
+        for code_obj in codes:
+            code_map[code_obj["code"]] = chunk_id
+    return code_map, corrupt
+
+
+def load_code_map(code_map_path: Path, fingerprint: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Load the code map sidecar if it exists and matches the fingerprint"""
+    if not code_map_path.exists():
+        return None
+    
+    with open(code_map_path, "rb") as f:
+        header = pickle.load(f)
+        if header.get("version") != SNAPSHOT_VERSION or header.get("fingerprint") != fingerprint:
+            return None
+        return pickle.load(f)
+
+
+def write_code_map(code_map_path: Path, fingerprint: Dict[str, Any], code_map: Dict[str, Any]) -> None:
+    """Write the code map sidecar atomically (temp file + rename)"""
+    tmp_path = code_map_path.with_name(f"{code_map_path.name}.{os.getpid()}.tmp")
+    header = {"version": SNAPSHOT_VERSION, "fingerprint": fingerprint}
+    
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(code_map, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, code_map_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+class LazyChunkCatalog:
+    """Code lookups that parse chunks on first access and keep an LRU-bounded set resident"""
+    
+    def __init__(
+        self,
+        chunks_dir: Path,
+        chunks: List[Dict[str, Any]],
+        code_map: Dict[str, int],
+        max_resident_chunks: int,
+        chunk_report: Optional[Dict[str, Any]] = None
+    ):
+        self.chunks_dir = chunks_dir
+        self.chunks = chunks
+        self.code_map = code_map
+        # chunk id -> {code: record}; 0 = every chunk may stay resident once parsed
+        self.resident = LRUCache(max_resident_chunks if max_resident_chunks > 0 else len(chunks) or 1)
+        self.chunk_report = chunk_report if chunk_report is not None else {}  # Catalog's loaded/missing/corrupt lists
+        self.failed: Dict[int, str] = {}  # chunk id -> reason, for chunks that could not be loaded
+        self.chunk_loads = 0
+    
+    def __len__(self) -> int:
+        return len(self.code_map)
+    
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        """Get a record by exact code, parsing its chunk if it is not resident"""
+        chunk_id = self.code_map.get(code)
+        if chunk_id is None:
+            return None
+        return self._chunk(chunk_id).get(code)
+    
+    def _group_by_chunk(self, codes: List[str]) -> Dict[int, List[str]]:
+        """Codes grouped by the chunk holding them (unknown codes are dropped)"""
+        by_chunk: Dict[int, List[str]] = {}
+        for code in codes:
+            chunk_id = self.code_map.get(code)
+            if chunk_id is not None:
+                by_chunk.setdefault(chunk_id, []).append(code)
+        return by_chunk
+    
+    def get_many(self, codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the records of many codes, parsing each needed chunk once (codes are grouped by chunk)"""
+        records: Dict[str, Dict[str, Any]] = {}
+        for chunk_id, chunk_codes in self._group_by_chunk(codes).items():
+            chunk = self._chunk(chunk_id)
+            for code in chunk_codes:
+                # The chunk file may have changed since the code map was built
+                code_obj = chunk.get(code)
+                if code_obj is not None:
+                    records[code] = code_obj
+        return records
+    
+    def preload(self, codes: List[str]) -> None:
+        """Parse the chunks holding these codes so later lookups find them resident (run in a worker thread)"""
+        for chunk_id in self._group_by_chunk(codes):
+            self._chunk(chunk_id)
+    
+    def _chunk(self, chunk_id: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a chunk's code -> record dict, loading it (and evicting the LRU chunk) if needed.
+        A chunk that cannot be loaded is recorded as missing or corrupt and yields no records.
+        """
+        records = self.resident.get(chunk_id)
+        if records is None:
+            if chunk_id in self.failed:
+                return {}
+            chunk = self.chunks[chunk_id]
+            try:
+                records = {code_obj["code"]: code_obj for code_obj in load_chunk(self.chunks_dir, chunk)}
+            except (OSError, ValueError) as error:
+                self._record_failure(chunk_id, error)
+                return {}
+            self.resident.put(chunk_id, records)
+            self.chunk_loads += 1
+        return records
+    
+    def _record_failure(self, chunk_id: int, error: Exception) -> None:
+        """Move a chunk that failed to load from the catalog's loaded chunks to its missing or corrupt ones"""
+        file_name = self.chunks[chunk_id]["fileName"]
+        reason = str(error) or type(error).__name__
+        self.failed[chunk_id] = reason
+        
+        report = self.chunk_report
+        if file_name in report.get("loaded", []):
+            report["loaded"].remove(file_name)
+        if isinstance(error, FileNotFoundError):
+            report.setdefault("missing", []).append(file_name)
+            print(f"  Missing chunk: {file_name}")
+        else:
+            report.setdefault("corrupt", []).append({"fileName": file_name, "reason": reason})
+            print(f"  Skipping corrupt chunk {file_name}: {reason}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get resident chunk statistics"""
+        return {
+            "indexedCodes": len(self.code_map),
+            "residentChunks": [self.chunks[chunk_id]["fileName"] for chunk_id in self.resident.keys()],
+            "maxResidentChunks": self.resident.max_size,
+            "chunkLoads": self.chunk_loads,
+            "failedChunks": [self.chunks[chunk_id]["fileName"] for chunk_id in self.failed],
+            "chunkCache": self.resident.get_stats(),
+        }
@@ -0,0 +1,224 @@
+"""
+Code Payment Table
+Per-site payments of every CPT/HCPCS code, computed for the whole catalog at once with NumPy.
+
+The payment inputs (APC rate, facility and non-facility RVU) are extracted into columns when the
+catalog indexes are built; the IPPS/HOPD/ASC/OBL payments derived from them depend on the
+conversion-factor settings and are recomputed in one vectorized pass whenever those change.
+The arithmetic mirrors Code.calculate_payments operation for operation (np.rint rounds half to
+even like round()), so results are identical. Records whose metadata does not hold plain numbers
+are left out of the table and keep going through Code.calculate_payments.
+Alongside the payments, each row's best-paying site and payment spread are derived for ranking queries.
+"""
+
+import heapq
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.models.code import APC_RATES
+
+
+PAYMENT_TYPES = ("CPT", "HCPCS")
+PAYMENT_SITES = ("IPPS", "HOPD", "ASC", "OBL")
+MAX_RVU = 1e12  # larger values would not round exactly in float64
+
+
+def payment_settings_key() -> tuple:
+    """Settings Code.calculate_payments (and so every derived payment) reads"""
+    return (
+        settings.facility_conversion_factor,
+        settings.non_facility_conversion_factor,
+        settings.ipps_multiplier,
+    )
+
+
+def _rvu(value: Any) -> float:
+    """An RVU column value: 0 for missing/falsy values, raises ValueError for anything but a finite number"""
+    if not value:
+        return 0.0
+    if type(value) not in (int, float) or not math.isfinite(value) or abs(value) > MAX_RVU:
+        raise ValueError(f"Irregular RVU: {value!r}")
+    return float(value)
+
+
+def payment_inputs(code_obj: Dict[str, Any]) -> Optional[tuple]:
+    """
+    (APC rate, facility RVU, non-facility RVU) of a CPT/HCPCS record as Code.calculate_payments reads them,
+    or None if the record is irregular and must be priced by Code.calculate_payments itself.
+    Records whose detail view would fail to render (and report zero payments) are irregular too.
+    """
+    metadata = code_obj.get("metadata", {})
+    labels = code_obj.get("labels", [])
+    if not isinstance(code_obj.get("code"), str) or not code_obj["code"] or not isinstance(metadata, dict):
+        return None
+    if labels and not isinstance(labels, (list, str)):
+        return None
+    if not isinstance(metadata.get(code_obj.get("type"), {}), dict):
+        return None
+    
+    entry = metadata.get("CPT") or metadata.get("HCPCS") or {}
+    if not isinstance(entry, dict):
+        return None
+    
+    try:
+        apc = entry.get("APC")
+        apc_rate = APC_RATES.get(apc, 0) if apc else 0
+        return apc_rate, _rvu(entry.get("FACILITY_RVU", 0)), _rvu(entry.get("NONFACILITY_RVU", 0))
+    except (TypeError, ValueError):
+        return None
+
+
+class PaymentTable:
+    """Payment input columns for the catalog's CPT/HCPCS codes plus the derived per-site payments"""
+    
+    def __init__(self):
+        self.rows: Dict[str, int] = {}  # code -> row
+        self.codes: List[str] = []  # row -> code
+        self.apc_rate = array("d")
+        self.facility_rvu = array("d")
+        self.nonfacility_rvu = array("d")
+        self._computed: Optional[tuple] = None  # (settings key, {"payments", "bestSite", "spread"} arrays)
+    
+    @classmethod
+    def build(cls, codes: Sequence[Dict[str, Any]], code_positions: Dict[str, int], types: Sequence[Optional[str]]) -> "PaymentTable":
+        """Extract the payment inputs of the record each code resolves to (its last position)"""
+        table = cls()
+        for code, position in code_positions.items():
+            if types[position] not in PAYMENT_TYPES:
+                continue
+            inputs = payment_inputs(codes[position])
+            if inputs is None:
+                continue
+            table.rows[code] = len(table.apc_rate)
+            table.codes.append(code)
+            table.apc_rate.append(inputs[0])
+            table.facility_rvu.append(inputs[1])
+            table.nonfacility_rvu.append(inputs[2])
+        return table
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Derived payments depend on the settings of the process that loads the table
+        return {**self.__dict__, "_computed": None}
+    
+    def _compute(self) -> Dict[str, np.ndarray]:
+        """
+        Derive IPPS/HOPD/ASC/OBL payments for every row (same operations and order as Code.calculate_payments),
+        each row's best site (column of its highest payment, the first one on ties) and its spread (highest - lowest)
+        """
+        apc_rate = np.frombuffer(self.apc_rate, dtype=np.float64)
+        facility_rvu = np.frombuffer(self.facility_rvu, dtype=np.float64)
+        nonfacility_rvu = np.frombuffer(self.nonfacility_rvu, dtype=np.float64)
+        has_facility_rvu = facility_rvu > 0
+        
+        obl = np.where(nonfacility_rvu > 0, np.rint(nonfacility_rvu * settings.non_facility_conversion_factor), 0)
+        hopd = np.where(
+            apc_rate > 0,
+            apc_rate,
+            np.where(has_facility_rvu, np.rint(facility_rvu * settings.facility_conversion_factor * 35), 0),
+        )
+        has_hopd = hopd > 0
+        asc = np.where(has_hopd, np.rint(hopd * 0.65), np.where(has_facility_rvu, np.rint(facility_rvu * 50 * 20), 0))
+        ipps = np.where(
+            has_hopd,
+            np.rint(hopd * settings.ipps_multiplier),
+            np.where(has_facility_rvu, np.rint(facility_rvu * settings.facility_conversion_factor * 50), 0),
+        )
+        payments = np.stack([ipps, hopd, asc, obl], axis=1).astype(np.int64)
+        return {
+            "payments": payments,
+            "bestSite": payments.argmax(axis=1) if len(payments) else np.zeros(0, dtype=np.intp),
+            "spread": np.ptp(payments, axis=1) if len(payments) else np.zeros(0, dtype=np.int64),
+        }
+    
+    def _derived(self) -> Dict[str, np.ndarray]:
+        """Derived columns for the current settings, recomputed when the conversion factors change"""
+        key = payment_settings_key()
+        computed = self._computed
+        if computed is None or computed[0] != key:
+            computed = (key, self._compute())
+            self._computed = computed
+        return computed[1]
+    
+    @property
+    def payments(self) -> np.ndarray:
+        """Per-site payments, one row per code and columns in PAYMENT_SITES order"""
+        return self._derived()["payments"]
+    
+    def rank(
+        self,
+        sort_by: str = "spread",
+        site: Optional[str] = None,
+        compare_to: Optional[str] = None,
+        best_site: Optional[str] = None,
+        min_payment: Optional[float] = None,
+        codes: Optional[Iterable[str]] = None,
+        descending: bool = True,
+        limit: int = 50
+    ) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Number of matching rows and the top (row, value) pairs, ordered by value then code.
+        sort_by: "payment" at site, "spread" across sites, or "delta" = payment at site - payment at compare_to.
+        Filters: best_site (the row's best-paying site), min_payment (at site) and codes (restrict to these codes).
+        """
+        derived = self._derived()
+        payments = derived["payments"]
+        mask = np.ones(len(payments), dtype=bool)
+        
+        if codes is not None:
+            mask[:] = False
+            mask[[row for row in map(self.rows.get, codes) if row is not None]] = True
+        if best_site is not None:
+            mask &= derived["bestSite"] == PAYMENT_SITES.index(best_site)
+        if min_payment is not None:
+            mask &= payments[:, PAYMENT_SITES.index(site)] >= min_payment
+        
+        if sort_by == "payment":
+            values = payments[:, PAYMENT_SITES.index(site)]
+        elif sort_by == "delta":
+            values = payments[:, PAYMENT_SITES.index(site)] - payments[:, PAYMENT_SITES.index(compare_to)]
+        else:
+            values = derived["spread"]
+        
+        rows = np.flatnonzero(mask)
+        total = len(rows)
+        sign = -1 if descending else 1
+        keys = sign * values[rows]
+        if total > limit:
+            # Only rows up to the limit-th key (ties included) can make the top; the heap orders those by code too
+            keep = keys <= np.partition(keys, limit - 1)[limit - 1]
+            rows = rows[keep]
+            keys = keys[keep]
+        items = zip(rows.tolist(), keys.tolist())
+        top = heapq.nsmallest(limit, items, key=lambda item: (item[1], self.codes[item[0]]))
+        return total, [(row, sign * key) for row, key in top]
+    
+    def get(self, code: str) -> Optional[Dict[str, int]]:
+        """Payments by site for a code, or None if the code is not in the table"""
+        row = self.rows.get(code)
+        if row is None:
+            return None
+        return dict(zip(PAYMENT_SITES, self.payments[row].tolist()))
+    
+    def describe(self, row: int) -> Dict[str, Any]:
+        """Payments by site, best site and spread of a row"""
+        derived = self._derived()
+        return {
+            "code": self.codes[row],
+            "payments": dict(zip(PAYMENT_SITES, derived["payments"][row].tolist())),
+            "bestSite": PAYMENT_SITES[int(derived["bestSite"][row])],
+            "spread": int(derived["spread"][row]),
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get payment table statistics"""
+        return {
+            "rows": len(self.rows),
+            "computed": self._computed is not None,
+        }
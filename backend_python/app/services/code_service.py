@@ -1,28 +1,119 @@
 """
 Code Intelligence Service
 Provides efficient loading, indexing, and querying of medical codes (CPT, HCPCS, ICD-10/Dx, PCS)
-Supports loading from chunked JSON files for better memory management
+Supports loading from chunked JSON files for better memory management,
+with a precompiled catalog snapshot for fast restarts and an mmap-shared catalog for multi-worker deployments.
+Other catalog versions (e.g. the prior code year) are loaded side by side and selected per request.
 """
 
+import asyncio
+import base64
+import csv
+import io
 import json
 import os
-from typing import Dict, List, Optional, Any
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Iterable, Iterator, Optional, Any
 from pathlib import Path
 
+import numpy as np
+
+from app.config import settings
 from app.models.code import Code
+from app.services.cache import LRUCache
+from app.services.code_catalog import CodeCatalog, normalize_type, parse_chunk
+from app.services.code_indexes import TokenIndex
+from app.services.code_payments import PAYMENT_SITES, PAYMENT_TYPES, payment_settings_key
+from app.services.code_store import CompactCodeStore
+from app.services.code_snapshot import compute_fingerprint, load_snapshot, write_snapshot
+from app.services.code_shared import attach_shared, write_shared, shared_build_lock
+from app.services.code_lazy import LazyChunkCatalog, build_code_map, load_code_map, write_code_map
+
+
+def _encode_cursor(payload: Dict[str, Any]) -> str:
+    """Encode a pagination cursor as an opaque URL-safe token"""
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a pagination cursor created by _encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload.get("k"), str) or not isinstance(payload.get("c"), str) or not isinstance(payload.get("p"), int):
+            raise ValueError
+        return payload
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+# Column order for CSV exports
+EXPORT_CSV_COLUMNS = ["code", "description", "category", "type", "labels"]
+
+
+def _version_effective_date(version: str, manifest: Dict[str, Any]) -> Optional[str]:
+    """ISO date a catalog version takes effect: the manifest's effectiveDate, else January 1st of a year-named version"""
+    if manifest.get("effectiveDate"):
+        return str(manifest["effectiveDate"])
+    if re.fullmatch(r"\d{4}", version):
+        return f"{version}-01-01"
+    return None
 
 
 class CodeService:
     """Code service for managing medical codes"""
     
-    def __init__(self):
-        self.codes: List[Dict[str, Any]] = []
-        self.code_index: Dict[str, Dict[str, Any]] = {}  # code -> full object
-        self.type_index: Dict[str, List[Dict[str, Any]]] = {}  # type -> [codes]
-        self.search_index: List[Dict[str, Any]] = []  # Array for text search
+    def __init__(self, chunks_dir: Optional[Path] = None, version: Optional[str] = None):
+        self.chunks_dir = chunks_dir  # None = data/codes_chunks (the current catalog)
+        self.version = version or settings.code_current_version
+        self.effective_date: Optional[str] = None  # Set from the manifest once loaded
+        self.versions: Dict[str, "CodeService"] = {}  # Other catalog versions by name (current catalog only)
+        self.catalog = CodeCatalog()
         self._is_loaded = False
         self.load_error: Optional[Exception] = None
-        self.manifest: Optional[Dict[str, Any]] = None  # Manifest info when loading chunks
+        self.load_info: Dict[str, Any] = {}  # How the catalog was loaded (snapshot vs JSON) and timing
+        self.lazy: Optional[LazyChunkCatalog] = None  # Set while running in lazy mode, until promoted
+        self._fingerprint: Optional[Dict[str, Any]] = None  # Fingerprint of the chunk files the catalog was built from
+        self._load_lock = asyncio.Lock()  # Serializes lazy promotion and reloads
+        
+        # Rendered summary/detail dicts by (code, type), invalidated with the catalog and payment settings
+        self._summary_cache = LRUCache(settings.code_render_cache_size)
+        self._detail_cache = LRUCache(settings.code_render_cache_size)
+        self._render_settings = payment_settings_key()
+    
+    @property
+    def codes(self) -> List[Dict[str, Any]]:
+        return self.catalog.codes
+    
+    @property
+    def code_index(self) -> Dict[str, Dict[str, Any]]:
+        return self.catalog.code_index
+    
+    @property
+    def type_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self.catalog.type_index
+    
+    @property
+    def search_index(self) -> TokenIndex:
+        return self.catalog.search_index
+    
+    @property
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        return self.catalog.manifest
+    
+    def _set_catalog(self, catalog: CodeCatalog) -> None:
+        """Swap in a new catalog and drop renders of the old one"""
+        self.catalog = catalog
+        self._summary_cache.clear()
+        self._detail_cache.clear()
+    
+    def _get_chunks_dir(self) -> Path:
+        """Get the directory holding this catalog version's manifest.json and chunks"""
+        if self.chunks_dir is not None:
+            return self.chunks_dir
+        return self._get_data_path() / "codes_chunks"
     
     def _get_data_path(self) -> Path:
         """Get the path to the data directory"""
@@ -43,55 +134,487 @@ class CodeService:
         
         try:
             data_path = self._get_data_path()
-            chunks_dir = data_path / "codes_chunks"
+            chunks_dir = self._get_chunks_dir()
             manifest_path = chunks_dir / "manifest.json"
             
             # Check if chunked files exist
-            if manifest_path.exists():
+            if manifest_path.exists() and settings.code_load_mode == "lazy":
+                await self._load_lazy(chunks_dir, manifest_path)
+            elif manifest_path.exists():
                 await self._load_from_chunks(chunks_dir, manifest_path)
             else:
                 # Fallback to single file loading
                 await self._load_from_single_file(data_path)
             
+            self.effective_date = _version_effective_date(self.version, self.manifest or {})
             self._is_loaded = True
         except Exception as error:
             print(f"Error loading codes: {error}")
             self.load_error = error
             raise
+        
+        if self.chunks_dir is None:
+            await self._load_versions()
+    
+    def _get_versions_dir(self) -> Path:
+        """Get the directory holding the other catalog versions"""
+        if settings.code_versions_path:
+            return Path(settings.code_versions_path)
+        return self._get_data_path() / "code_versions"
     
-    async def _load_from_chunks(self, chunks_dir: Path, manifest_path: Path) -> None:
-        """Load codes from chunked JSON files"""
+    async def _load_versions(self) -> None:
+        """
+        Load every other catalog version (one subdirectory with a manifest.json each) next to the current one.
+        Records identical in the current catalog are shared with it instead of being kept twice.
+        A version that fails to load is reported and left out; the current catalog keeps serving.
+        """
+        versions_dir = self._get_versions_dir()
+        if not versions_dir.is_dir():
+            return
+        
+        for version_dir in sorted(versions_dir.iterdir()):
+            if not (version_dir / "manifest.json").is_file():
+                continue
+            name = version_dir.name
+            if name == self.version:
+                print(f"Skipping code catalog version {name}: it is the current version")
+                continue
+            
+            print(f"Loading code catalog version {name}...")
+            service = CodeService(chunks_dir=version_dir, version=name)
+            try:
+                await service.load_codes()
+            except Exception as error:
+                print(f"Could not load code catalog version {name}: {error}")
+                continue
+            
+            shared = service.catalog.share_records(self.catalog)
+            service.load_info["sharedRecords"] = shared
+            self.versions[name] = service
+            print(f"Code catalog version {name} loaded ({shared} records shared with {self.version})")
+    
+    def get_version(self, version: Optional[str] = None, as_of: Optional[str] = None) -> "CodeService":
+        """
+        Get the service for a catalog version, by name or by the ISO date it should be in effect on
+        (the version with the latest effective date on or before as_of). Neither selects the current catalog.
+        Raises LookupError if no version matches.
+        """
+        if version:
+            if version == self.version:
+                return self
+            if version not in self.versions:
+                raise LookupError(f"Unknown code catalog version: {version}")
+            return self.versions[version]
+        
+        if as_of:
+            in_effect = [
+                service for service in (self, *self.versions.values())
+                if service.effective_date and service.effective_date <= as_of
+            ]
+            if not in_effect:
+                raise LookupError(f"No code catalog version in effect on {as_of}")
+            return max(in_effect, key=lambda service: service.effective_date)
+        
+        return self
+    
+    def get_versions(self) -> List[Dict[str, Any]]:
+        """List the loaded catalog versions, newest effective date first"""
+        services = sorted(
+            (self, *self.versions.values()),
+            key=lambda service: service.effective_date or "",
+            reverse=True,
+        )
+        return [
+            {
+                "version": service.version,
+                "effectiveDate": service.effective_date,
+                "current": service is self,
+                "totalCodes": len(service.lazy) if service.lazy is not None else len(service.codes),
+                "sharedRecords": service.load_info.get("sharedRecords", 0),
+                "degraded": service.is_degraded(),
+            }
+            for service in services
+        ]
+    
+    async def ensure_full_catalog(self) -> None:
+        """Promote a lazily loaded service to the full catalog (needed by list, search and export)"""
+        if self.lazy is None:
+            return
+        
+        async with self._load_lock:
+            if self.lazy is None:
+                return
+            print("Promoting lazy code catalog to a full load...")
+            chunks_dir = self._get_chunks_dir()
+            await self._load_from_chunks(chunks_dir, chunks_dir / "manifest.json")
+            self.lazy = None
+    
+    async def _load_lazy(self, chunks_dir: Path, manifest_path: Path) -> None:
+        """Load only the code -> chunk map; chunks are parsed on first access"""
+        import time
+        start_time = time.time()
+        
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        
+        chunks, missing = self._check_chunks(chunks_dir, manifest)
+        code_map_path = chunks_dir / "catalog.codemap"
+        fingerprint = compute_fingerprint(chunks_dir, manifest, manifest_path, "lazy")
+        
+        try:
+            code_map = load_code_map(code_map_path, fingerprint)
+        except Exception as error:
+            print(f"Could not read code map {code_map_path}: {error}")
+            code_map = None
+        
+        built = code_map is None
+        if built:
+            print(f"Code map {code_map_path.name} missing or stale - scanning {len(chunks)} chunks")
+            codes, corrupt = await asyncio.to_thread(build_code_map, chunks_dir, chunks)
+            code_map = {"codes": codes, "corrupt": corrupt}
+            try:
+                write_code_map(code_map_path, fingerprint, code_map)
+            except Exception as error:
+                print(f"Could not write code map {code_map_path}: {error}")
+        
+        corrupt_names = {entry["fileName"] for entry in code_map["corrupt"]}
+        loaded = [chunk["fileName"] for chunk in chunks if chunk["fileName"] not in corrupt_names]
+        if not loaded:
+            raise FileNotFoundError(f"No valid code chunks in {chunks_dir} ({len(missing)} missing, {len(corrupt_names)} corrupt)")
+        
+        catalog = CodeCatalog(manifest=manifest)
+        catalog.chunk_report = {"loaded": loaded, "missing": missing, "corrupt": code_map["corrupt"]}
+        self._set_catalog(catalog)
+        self.lazy = LazyChunkCatalog(
+            chunks_dir, chunks, code_map["codes"], settings.code_lazy_resident_chunks, catalog.chunk_report
+        )
+        self._fingerprint = fingerprint
+        self._record_load("lazy", start_time, codeMapBuilt=built)
+        print(f"Lazy code catalog ready: {len(self.lazy)} codes in {len(loaded)} chunks ({self.load_info['timeMs']}ms)")
+    
+    def _current_fingerprint(self) -> Optional[Dict[str, Any]]:
+        """Fingerprint of the chunk files on disk now, comparable with the loaded catalog's"""
+        chunks_dir = self._get_chunks_dir()
+        manifest_path = chunks_dir / "manifest.json"
+        if self._fingerprint is None or not manifest_path.exists():
+            return None
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return compute_fingerprint(chunks_dir, manifest, manifest_path, self._fingerprint["storage"])
+    
+    async def reload_codes(self) -> Dict[str, Any]:
+        """
+        Pick up added, changed or removed chunk files without a restart.
+        Only chunks whose file or manifest entry changed are parsed again; the rebuilt catalog
+        is swapped in as a unit, so in-flight requests keep using the previous one.
+        """
+        import time
+        start_time = time.time()
+        chunks_dir = self._get_chunks_dir()
+        
+        async with self._load_lock:
+            fingerprint = self._current_fingerprint()
+            if fingerprint is None:
+                return {"reloaded": False, "reason": "Catalog is not loaded from chunk files"}
+            
+            old_chunks = self._fingerprint["chunks"]
+            new_chunks = fingerprint["chunks"]
+            changes = {
+                "added": sorted(name for name in new_chunks if name not in old_chunks),
+                "removed": sorted(name for name in old_chunks if name not in new_chunks),
+                "changed": sorted(name for name in new_chunks if name in old_chunks and new_chunks[name] != old_chunks[name]),
+            }
+            if fingerprint == self._fingerprint:
+                return {"reloaded": False, "reason": "No changes", **changes}
+            
+            print(f"Reloading code chunks: {changes}")
+            if self.lazy is not None:
+                await self._load_lazy(chunks_dir, chunks_dir / "manifest.json")
+            else:
+                await self._load_from_chunks(chunks_dir, chunks_dir / "manifest.json", previous=self.catalog)
+            
+            reparsed = [timing["fileName"] for timing in self.load_info.get("chunks", []) if not timing.get("reused")]
+            self.load_info["reloadedAt"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            return {
+                "reloaded": True,
+                **changes,
+                "reparsed": reparsed,
+                "totalCodes": len(self.lazy) if self.lazy is not None else len(self.codes),
+                "degraded": self.catalog.is_degraded,
+                "timeMs": int((time.time() - start_time) * 1000),
+            }
+    
+    async def watch_chunks(self, interval_seconds: float) -> None:
+        """Poll the chunk manifest and files, reloading whenever they change (runs until cancelled)"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                fingerprint = self._current_fingerprint()
+                if fingerprint is not None and fingerprint != self._fingerprint:
+                    result = await self.reload_codes()
+                    print(f"Code chunks reloaded: {result}")
+            except Exception as error:
+                print(f"Code chunk reload failed: {error}")
+    
+    def _get_snapshot_path(self, chunks_dir: Path) -> Path:
+        """Get the path of the precompiled catalog snapshot (other versions keep theirs next to their chunks)"""
+        if settings.code_snapshot_path and self.chunks_dir is None:
+            return Path(settings.code_snapshot_path)
+        return chunks_dir / "catalog.snapshot"
+    
+    def _record_load(self, path: str, start_time: float, **extra: Any) -> None:
+        """Remember which load path was taken and how long it took"""
+        import time
+        self.load_info = {
+            "path": path,
+            "timeMs": int((time.time() - start_time) * 1000),
+            **extra,
+        }
+    
+    async def _load_from_chunks(self, chunks_dir: Path, manifest_path: Path, previous: Optional[CodeCatalog] = None) -> None:
+        """
+        Load codes from the shared catalog file or a fresh snapshot, otherwise from chunked JSON files
+        (reusing the unchanged chunks of a previous catalog on reload)
+        """
         import time
-        print("Loading codes from chunked files...")
         start_time = time.time()
         
         # Read manifest
         with open(manifest_path, "r", encoding="utf-8") as f:
-            self.manifest = json.load(f)
+            manifest = json.load(f)
         
-        print(f"Manifest: {self.manifest['chunkCount']} chunks, {self.manifest['totalCodes']} total codes")
+        snapshot_path = self._get_snapshot_path(chunks_dir)
+        fingerprint = compute_fingerprint(chunks_dir, manifest, manifest_path, settings.code_storage_mode)
         
-        # Load each chunk
-        loaded_codes = 0
-        for chunk in self.manifest["chunks"]:
-            chunk_path = chunks_dir / chunk["fileName"]
-            chunk_start = time.time()
+        if settings.code_storage_mode == "shared":
+            await self._load_shared(chunks_dir, manifest, fingerprint, start_time, previous)
+            self._fingerprint = fingerprint
+            return
+        
+        if settings.code_snapshot_enabled:
+            try:
+                catalog = load_snapshot(snapshot_path, fingerprint)
+            except Exception as error:
+                print(f"Could not read catalog snapshot {snapshot_path}: {error}")
+                catalog = None
             
-            with open(chunk_path, "r", encoding="utf-8") as f:
-                chunk_codes = json.load(f)
+            if catalog is not None:
+                self._set_catalog(catalog)
+                self._fingerprint = fingerprint
+                self._record_load("snapshot", start_time, snapshotPath=str(snapshot_path))
+                print(f"Loaded {len(catalog.codes)} codes from snapshot {snapshot_path.name} in {self.load_info['timeMs']}ms")
+                return
             
-            # Add to main codes array
-            self.codes.extend(chunk_codes)
-            loaded_codes += len(chunk_codes)
+            print(f"Catalog snapshot {snapshot_path.name} missing or stale - parsing JSON chunks")
+        
+        catalog, chunk_timings = await self._build_from_chunks(
+            chunks_dir, manifest, settings.code_storage_mode == "compact", fingerprint, previous
+        )
+        self._set_catalog(catalog)
+        self._fingerprint = fingerprint
+        self._record_load("json", start_time, chunks=chunk_timings)
+        
+        print(f"Total loading + indexing: {self.load_info['timeMs']}ms")
+        
+        if settings.code_snapshot_enabled:
+            try:
+                write_snapshot(snapshot_path, fingerprint, catalog)
+                print(f"Wrote catalog snapshot: {snapshot_path}")
+            except Exception as error:
+                print(f"Could not write catalog snapshot {snapshot_path}: {error}")
+    
+    def _get_shared_path(self, chunks_dir: Path) -> Path:
+        """Get the path of the shared catalog file (other versions keep theirs next to their chunks)"""
+        if settings.code_shared_path and self.chunks_dir is None:
+            return Path(settings.code_shared_path)
+        return chunks_dir / "catalog.shared"
+    
+    def _attach_shared(self, shared_path: Path, fingerprint: Dict[str, Any]) -> Optional[CodeCatalog]:
+        """Attach to the shared catalog file, or None if it is missing, stale or unreadable"""
+        try:
+            return attach_shared(shared_path, fingerprint)
+        except Exception as error:
+            print(f"Could not attach shared catalog {shared_path}: {error}")
+            return None
+    
+    async def _load_shared(
+        self,
+        chunks_dir: Path,
+        manifest: Dict[str, Any],
+        fingerprint: Dict[str, Any],
+        start_time: float,
+        previous: Optional[CodeCatalog] = None
+    ) -> None:
+        """Attach to the shared catalog file, building it first if no other worker has"""
+        shared_path = self._get_shared_path(chunks_dir)
+        built = False
+        chunk_timings: List[Dict[str, Any]] = []
+        
+        catalog = self._attach_shared(shared_path, fingerprint)
+        if catalog is None:
+            async with shared_build_lock(shared_path):
+                # Another worker may have built the file while we waited for the lock
+                catalog = self._attach_shared(shared_path, fingerprint)
+                if catalog is None:
+                    print(f"Shared catalog {shared_path.name} missing or stale - building it")
+                    built_catalog, chunk_timings = await self._build_from_chunks(chunks_dir, manifest, True, fingerprint, previous)
+                    write_shared(shared_path, fingerprint, built_catalog)
+                    del built_catalog
+                    print(f"Wrote shared catalog: {shared_path}")
+                    catalog = attach_shared(shared_path, fingerprint)
+                    built = True
+        
+        self._set_catalog(catalog)
+        self._record_load("shared", start_time, sharedPath=str(shared_path), sharedBuilt=built, chunks=chunk_timings)
+        print(f"Attached shared catalog {shared_path.name} ({len(catalog.codes)} codes) in {self.load_info['timeMs']}ms")
+    
+    def _get_load_workers(self, chunk_count: int) -> int:
+        """Number of processes to parse chunks with"""
+        workers = settings.code_load_workers or os.cpu_count() or 1
+        return max(1, min(workers, chunk_count))
+    
+    def _check_chunks(self, chunks_dir: Path, manifest: Dict[str, Any]) -> tuple:
+        """Split the manifest's chunks (in catalog order) into present and missing files"""
+        chunks = sorted(manifest["chunks"], key=lambda chunk: chunk.get("startIndex", 0))
+        present = [chunk for chunk in chunks if (chunks_dir / chunk["fileName"]).is_file()]
+        missing = [chunk["fileName"] for chunk in chunks if not (chunks_dir / chunk["fileName"]).is_file()]
+        for file_name in missing:
+            print(f"  Missing chunk: {file_name}")
+        return present, missing
+    
+    async def _parse_chunks(self, chunks_dir: Path, chunks: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Parse chunk files concurrently in a process pool, returning results in the given order.
+        A chunk that fails verification or parsing yields its exception instead of a result.
+        """
+        workers = self._get_load_workers(len(chunks))
+        if workers == 1:
+            results = []
+            for chunk in chunks:
+                try:
+                    results.append(parse_chunk(str(chunks_dir), chunk))
+                except Exception as error:
+                    results.append(error)
+            return results
+        
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return await asyncio.gather(
+                *(loop.run_in_executor(pool, parse_chunk, str(chunks_dir), chunk) for chunk in chunks),
+                return_exceptions=True,
+            )
+    
+    async def _build_from_chunks(
+        self,
+        chunks_dir: Path,
+        manifest: Dict[str, Any],
+        compact: bool,
+        fingerprint: Dict[str, Any],
+        previous: Optional[CodeCatalog] = None
+    ) -> tuple:
+        """
+        Verify and parse the chunked JSON files in parallel and build a catalog with its indexes.
+        Missing or corrupt chunks are skipped and recorded in catalog.chunk_report.
+        With a previous catalog (reload), chunks whose manifest entry and file signature are unchanged
+        reuse its records and search postings instead of being parsed again.
+        Returns (catalog, per-chunk timings).
+        """
+        import time
+        start_time = time.time()
+        
+        print("Loading codes from chunked files...")
+        print(f"Manifest: {manifest['chunkCount']} chunks, {manifest['totalCodes']} total codes")
+        
+        # Chunks are merged in catalog order, whatever order the workers finish in
+        chunks, missing = self._check_chunks(chunks_dir, manifest)
+        signatures = fingerprint.get("chunks", {})
+        reused: Dict[str, Dict[str, Any]] = {}
+        if previous is not None:
+            for chunk in chunks:
+                span = previous.chunk_spans.get(chunk["fileName"])
+                if span and span["entry"] == chunk and span["signature"] == signatures.get(chunk["fileName"]):
+                    reused[chunk["fileName"]] = span
+        
+        to_parse = [chunk for chunk in chunks if chunk["fileName"] not in reused]
+        parsed = dict(zip((chunk["fileName"] for chunk in to_parse), await self._parse_chunks(chunks_dir, to_parse)))
+        
+        search_index = TokenIndex()
+        record_sources: List[Any] = []
+        chunk_timings = []
+        chunk_spans = {}
+        loaded = []
+        corrupt = []
+        position = 0
+        pending = None  # run of reused chunks, contiguous in the previous catalog: [start, end)
+        
+        for chunk in chunks:
+            name = chunk["fileName"]
+            span = reused.get(name)
+            if span is not None:
+                # Copy runs of reused chunks in one pass over the previous postings
+                if pending and pending[1] == span["start"]:
+                    pending[1] += span["count"]
+                else:
+                    if pending:
+                        search_index.extend_from(previous.search_index, *pending)
+                    pending = [span["start"], span["start"] + span["count"]]
+                record_sources.append((previous.codes, span["start"], span["start"] + span["count"]))
+                count = span["count"]
+                chunk_timings.append({"fileName": name, "codes": count, "parseMs": 0, "indexMs": 0, "reused": True})
+            else:
+                result = parsed[name]
+                if isinstance(result, Exception):
+                    corrupt.append({"fileName": name, "reason": str(result) or type(result).__name__})
+                    print(f"  Skipping corrupt chunk {name}: {corrupt[-1]['reason']}")
+                    continue
+                
+                if pending:
+                    search_index.extend_from(previous.search_index, *pending)
+                    pending = None
+                search_index.extend(result.pop("searchIndex"))
+                count = len(result["codes"])
+                record_sources.append((result.pop("codes"), 0, count))
+                chunk_timings.append({
+                    "fileName": name,
+                    "codes": count,
+                    "parseMs": result["parseMs"],
+                    "indexMs": result["indexMs"],
+                    "reused": False,
+                })
+                print(f"  Loaded {name}: {count} codes (parse {result['parseMs']}ms, index {result['indexMs']}ms)")
             
-            print(f"  Loaded {chunk['fileName']}: {len(chunk_codes)} codes ({int((time.time() - chunk_start) * 1000)}ms)")
+            loaded.append(name)
+            chunk_spans[name] = {"entry": chunk, "signature": signatures.get(name), "start": position, "count": count}
+            position += count
         
-        print(f"Loaded {loaded_codes} codes from {self.manifest['chunkCount']} chunks in {int((time.time() - start_time) * 1000)}ms")
+        if pending:
+            search_index.extend_from(previous.search_index, *pending)
+        del parsed
         
-        # Build indexes
-        self._build_indexes()
+        if not loaded:
+            raise FileNotFoundError(f"No valid code chunks in {chunks_dir} ({len(missing)} missing, {len(corrupt)} corrupt)")
+        
+        # Release each chunk's records as soon as they are merged
+        def drain_sources():
+            while record_sources:
+                yield record_sources.pop(0)
+        
+        if compact:
+            codes = CompactCodeStore.from_sources(drain_sources())
+        else:
+            codes = [code_obj for records, start, end in drain_sources() for code_obj in records[start:end]]
+        catalog = CodeCatalog(codes=codes, manifest=manifest)
+        catalog.chunk_report = {"loaded": loaded, "missing": missing, "corrupt": corrupt}
+        catalog.chunk_spans = chunk_spans
+        
+        print(f"Loaded {len(catalog.codes)} codes from {len(loaded)}/{len(manifest['chunks'])} chunks ({len(reused)} reused) with {self._get_load_workers(len(to_parse))} workers in {int((time.time() - start_time) * 1000)}ms")
+        if catalog.is_degraded:
+            print(f"WARNING: code catalog is degraded ({len(missing)} missing, {len(corrupt)} corrupt chunks)")
         
-        print(f"Total loading + indexing: {int((time.time() - start_time) * 1000)}ms")
+        # Build the remaining indexes on top of the merged search index, off the event loop so a
+        # hot reload does not stall in-flight requests
+        await asyncio.to_thread(catalog.build_indexes, search_index, previous)
+        return catalog, chunk_timings
     
     async def _load_from_single_file(self, data_path: Path) -> None:
         """Load codes from single JSON file (legacy/fallback)"""
@@ -103,57 +626,23 @@ class CodeService:
         
         # Read and parse JSON
         with open(codes_file, "r", encoding="utf-8") as f:
-            self.codes = json.load(f)
+            catalog = CodeCatalog(codes=json.load(f))
+        if settings.code_storage_mode != "dict":
+            # The shared file is keyed by the chunk manifest; a single-file catalog is kept compact per worker
+            catalog.codes = CompactCodeStore.from_records(catalog.codes)
         
-        print(f"Loaded {len(self.codes)} codes in {int((time.time() - start_time) * 1000)}ms")
+        print(f"Loaded {len(catalog.codes)} codes in {int((time.time() - start_time) * 1000)}ms")
         
         # Build indexes
-        self._build_indexes()
+        catalog.build_indexes()
+        self._set_catalog(catalog)
+        self._record_load("json", start_time)
         
-        print(f"Indexing complete in {int((time.time() - start_time) * 1000)}ms")
-    
-    def _build_indexes(self) -> None:
-        """Build in-memory indexes for fast lookup"""
-        print("Building indexes...")
-        
-        # Clear existing indexes
-        self.code_index.clear()
-        self.type_index.clear()
-        self.search_index = []
-        
-        for code_obj in self.codes:
-            # Index by code
-            self.code_index[code_obj["code"]] = code_obj
-            
-            # Index by type
-            code_type = self._normalize_type(code_obj.get("type"))
-            if code_type not in self.type_index:
-                self.type_index[code_type] = []
-            self.type_index[code_type].append(code_obj)
-            
-            # Build search index (code + description tokens)
-            self.search_index.append({
-                "code": code_obj["code"],
-                "search_text": f"{code_obj['code']} {code_obj.get('description', '')}".lower(),
-                "type": code_type,
-            })
-        
-        print("Index stats:")
-        print(f"  - Code index size: {len(self.code_index)}")
-        print(f"  - Types: {list(self.type_index.keys())}")
-        for type_name, codes in self.type_index.items():
-            print(f"    - {type_name}: {len(codes)} codes")
+        print(f"Indexing complete in {self.load_info['timeMs']}ms")
     
     def _normalize_type(self, code_type: Optional[str]) -> str:
         """Normalize type name for consistent querying"""
-        if not code_type:
-            return "OTHER"
-        upper_type = code_type.upper()
-        if upper_type == "DX":
-            return "ICD10"
-        if upper_type == "PCS":
-            return "ICD10-PCS"
-        return upper_type
+        return normalize_type(code_type)
     
     def get_all_codes(
         self,
@@ -161,36 +650,184 @@ class CodeService:
         offset: int = 0,
         code_type: Optional[str] = None,
         sort_by: str = "code",
-        sort_order: str = "asc"
+        sort_order: str = "asc",
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get all codes with pagination and filtering"""
-        if code_type:
-            results = self.type_index.get(code_type.upper(), []).copy()
-        else:
-            results = self.codes.copy()
+        """
+        Get all codes with pagination and filtering.
+        Pass the returned nextCursor as cursor to resume after the last row (offset is then ignored).
+        """
+        normalized_type = code_type.upper() if code_type else None
+        descending = sort_order == "desc"
+        sort_orders = self.catalog.sort_orders
         
-        # Sort
-        reverse = sort_order == "desc"
-        results.sort(key=lambda x: str(x.get(sort_by, "")), reverse=reverse)
+        # Slice a presorted permutation of catalog positions instead of copying and sorting
+        order = sort_orders.order(self.codes, normalized_type, sort_by, descending)
+        
+        if cursor:
+            after = _decode_cursor(cursor)
+            if after["s"] != sort_by or after["o"] != sort_order or after["t"] != normalized_type:
+                raise ValueError("Cursor does not match the requested type, sortBy and sortOrder")
+            offset = sort_orders.seek(self.codes, order, sort_by, descending, after["k"], after["c"], after["p"])
         
         # Paginate
-        paginated = results[offset:offset + limit]
+        paginated = order[offset:offset + limit]
+        has_more = offset + limit < len(order)
+        
+        next_cursor = None
+        if has_more and paginated:
+            last = self.codes[paginated[-1]]
+            next_cursor = _encode_cursor({
+                "k": str(last.get(sort_by, "")),
+                "c": last["code"],
+                "p": paginated[-1],
+                "s": sort_by,
+                "o": sort_order,
+                "t": normalized_type,
+            })
         
         return {
-            "codes": [self._format_code_summary(c) for c in paginated],
-            "total": len(results),
+            "codes": [self._format_code_summary(self.codes[position]) for position in paginated],
+            "total": len(order),
             "limit": limit,
             "offset": offset,
-            "hasMore": offset + limit < len(results),
+            "hasMore": has_more,
+            "nextCursor": next_cursor,
         }
     
+    async def preload_codes(self, codes: Iterable[str]) -> None:
+        """
+        In lazy mode, parse the chunks holding these codes in a worker thread so the lookups that follow
+        find them resident instead of parsing on the event loop (no-op for a fully loaded catalog)
+        """
+        lazy = self.lazy
+        if lazy is None:
+            return
+        requested = [code.strip() for code in codes if code and code.strip()]
+        await asyncio.to_thread(lazy.preload, requested + [code.upper() for code in requested])
+    
     def get_code(self, code: str) -> Optional[Dict[str, Any]]:
         """Get a single code by code string"""
-        code_obj = self.code_index.get(code) or self.code_index.get(code.upper())
+        index = self.lazy if self.lazy is not None else self.code_index
+        code_obj = index.get(code) or index.get(code.upper())
         if not code_obj:
             return None
         return self._format_code_detail(code_obj)
     
+    def get_codes_batch(self, codes: List[str]) -> Dict[str, Any]:
+        """
+        Get the details of many codes in one pass.
+        Inputs are stripped and deduplicated (first occurrence wins the order); unknown codes are listed in notFound.
+        """
+        requested = list(dict.fromkeys(code.strip() for code in codes if code and code.strip()))
+        if self.lazy is not None:
+            # Resolve all codes up front so each lazy chunk is parsed at most once
+            lookup = self.lazy.get_many(requested + [code.upper() for code in requested]).get
+        else:
+            lookup = self.code_index.get
+        
+        found = {}  # resolved code -> detail, so "j9999" and "J9999" are returned once
+        not_found = []
+        for code in requested:
+            code_obj = lookup(code) or lookup(code.upper())
+            if not code_obj:
+                not_found.append(code)
+            elif code_obj["code"] not in found:
+                found[code_obj["code"]] = self._format_code_detail(code_obj)
+        
+        return {
+            "codes": list(found.values()),
+            "requested": len(requested),
+            "notFound": not_found,
+        }
+    
+    def get_payment_for_site(self, code: str, site_of_service: str) -> Optional[float]:
+        """Get a code's payment at a site of service, or None if the code is not found"""
+        index = self.lazy if self.lazy is not None else self.code_index
+        code_obj = index.get(code) or index.get(code.upper())
+        if not code_obj:
+            return None
+        return Code.from_raw(code_obj).get_payment_for_site(
+            site_of_service, self.catalog.payment_table.get(code_obj["code"])
+        )
+    
+    def get_payment_rows(self, codes: List[str]) -> tuple:
+        """
+        Resolve many codes to their payments by site in one pass.
+        Returns (catalog code or None when not found, per input) and an int64 array of shape
+        (len(codes), 4) with columns in PAYMENT_SITES order. Rows come from the payment table;
+        codes it does not hold take the payments their detail view reports.
+        """
+        index = self.lazy if self.lazy is not None else self.code_index
+        table = self.catalog.payment_table
+        payments = np.zeros((len(codes), len(PAYMENT_SITES)), dtype=np.int64)
+        resolved: List[Optional[str]] = []
+        slots: List[int] = []
+        rows: List[int] = []
+        
+        for slot, code in enumerate(codes):
+            code_obj = index.get(code) or index.get(code.upper())
+            if not code_obj:
+                resolved.append(None)
+                continue
+            resolved.append(code_obj["code"])
+            row = table.rows.get(code_obj["code"])
+            if row is not None:
+                slots.append(slot)
+                rows.append(row)
+            elif normalize_type(code_obj.get("type")) in PAYMENT_TYPES:
+                detail_payments = self._format_code_detail(code_obj)["payments"]
+                payments[slot] = [detail_payments.get(site, 0) for site in PAYMENT_SITES]
+        
+        if rows:
+            payments[slots] = table.payments[rows]
+        return resolved, payments
+    
+    def rank_sites(
+        self,
+        sort_by: str = "spread",
+        site: Optional[str] = None,
+        compare_to: Optional[str] = None,
+        best_site: Optional[str] = None,
+        min_payment: Optional[float] = None,
+        codes: Optional[List[str]] = None,
+        descending: bool = True,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Rank CPT/HCPCS codes by payment at a site, payment spread across sites, or the payment delta
+        between two sites, using the payment table's precomputed best site and spread.
+        codes restricts the ranking to those codes (unknown ones are listed in notFound).
+        """
+        table = self.catalog.payment_table
+        catalog_codes = None
+        not_found: List[str] = []
+        if codes is not None:
+            catalog_codes = []
+            for code in dict.fromkeys(code.strip() for code in codes if code and code.strip()):
+                code_obj = self.code_index.get(code) or self.code_index.get(code.upper())
+                if code_obj:
+                    catalog_codes.append(code_obj["code"])
+                else:
+                    not_found.append(code)
+        
+        total, top = table.rank(sort_by, site, compare_to, best_site, min_payment, catalog_codes, descending, limit)
+        
+        ranked = []
+        for row, value in top:
+            entry = table.describe(row)
+            code_obj = self.code_index.get(entry["code"])
+            entry["description"] = code_obj.get("description") if code_obj else None
+            if sort_by == "delta":
+                entry["delta"] = value
+            ranked.append(entry)
+        
+        return {
+            "codes": ranked,
+            "total": total,
+            "notFound": not_found,
+        }
+    
     def search_codes(
         self,
         query: str,
@@ -204,47 +841,123 @@ class CodeService:
         search_term = query.lower().strip()
         terms = search_term.split()
         
-        # Score-based search
-        results = []
-        
-        for item in self.search_index:
-            # Filter by type if specified
-            if code_type and item["type"] != code_type.upper():
-                continue
-            
-            score = 0
-            
-            # Exact code match gets highest score
-            if item["code"].lower() == search_term:
-                score = 100
-            elif search_term in item["code"].lower():
-                score = 80
-            
-            # Term matching in description
-            for term in terms:
-                if term in item["search_text"]:
-                    score += 10
-            
-            if score > 0:
-                results.append({"code": item["code"], "score": score})
-        
-        # Sort by score descending
-        results.sort(key=lambda x: x["score"], reverse=True)
+        # Score-based search over the inverted index
+        search_index = self.search_index
+        scores = search_index.score(search_term, terms)
+        total, results = search_index.top(scores, limit, code_type.upper() if code_type else None)
         
         # Get full code objects for top results
         top_results = []
-        for r in results[:limit]:
-            code_obj = self.code_index.get(r["code"])
+        for position, _score in results:
+            code_obj = self.code_index.get(self.codes[position]["code"])
             if code_obj:
                 top_results.append(self._format_code_summary(code_obj))
         
         return {
             "codes": top_results,
-            "total": len(results),
+            "total": total,
             "query": query,
         }
     
+    def autocomplete(
+        self,
+        prefix: str,
+        limit: int = 10,
+        code_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get the first codes (in code order) starting with a prefix"""
+        prefix = (prefix or "").strip()
+        if not prefix:
+            return {"codes": [], "prefix": prefix}
+        
+        normalized_type = self._normalize_type(code_type) if code_type else None
+        matches = self.catalog.prefix_index.lookup(self.codes, prefix, limit, normalized_type)
+        
+        return {
+            "codes": [self._format_code_summary(self.codes[position]) for position in matches],
+            "prefix": prefix,
+        }
+    
+    def iter_export(
+        self,
+        code_type: Optional[str] = None,
+        export_format: str = "ndjson",
+        chunk_size: int = 1000
+    ) -> Iterator[str]:
+        """
+        Stream code summaries in code order as NDJSON lines or CSV rows.
+        Yields one string per chunk of chunk_size rows so memory stays flat regardless of catalog size.
+        """
+        catalog = self.catalog
+        order = catalog.sort_orders.order(catalog.codes, code_type.upper() if code_type else None, "code", False)
+        
+        buffer = io.StringIO()
+        writer = None
+        if export_format == "csv":
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_CSV_COLUMNS)
+        
+        for start in range(0, len(order), chunk_size):
+            # After a reload swapped the catalog mid-stream, render without touching the shared cache
+            format_summary = self._format_code_summary if catalog is self.catalog else self._render_code_summary
+            for position in order[start:start + chunk_size]:
+                summary = format_summary(catalog.codes[position])
+                if writer:
+                    writer.writerow([
+                        summary["code"],
+                        summary["description"],
+                        summary["category"],
+                        summary["type"],
+                        "|".join(summary["labels"] or []),
+                    ])
+                else:
+                    buffer.write(json.dumps(summary, separators=(",", ":")))
+                    buffer.write("\n")
+            
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        
+        # CSV header for an empty export
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    def _check_payment_settings(self) -> None:
+        """Drop cached details when the conversion-factor settings have changed"""
+        payment_settings = payment_settings_key()
+        if payment_settings != self._render_settings:
+            self._detail_cache.clear()
+            self._render_settings = payment_settings
+    
+    def _render_key(self, code_obj: Dict[str, Any]) -> Optional[tuple]:
+        """Render cache key: codes are only unique within a type (ICD-10 J9600 vs HCPCS J9600)"""
+        code = code_obj.get("code")
+        if not code:
+            return None
+        return (code, self._normalize_type(code_obj.get("type")))
+    
     def _format_code_summary(self, code_obj: Dict[str, Any]) -> Dict[str, Any]:
+        """Format code for summary listing (memoized by code and type; treat the result as read-only)"""
+        key = self._render_key(code_obj)
+        summary = self._summary_cache.get(key) if key else None
+        if summary is None:
+            summary = self._render_code_summary(code_obj)
+            if key:
+                self._summary_cache.put(key, summary)
+        return summary
+    
+    def _format_code_detail(self, code_obj: Dict[str, Any]) -> Dict[str, Any]:
+        """Format code for detailed view with payments (memoized by code and type; treat the result as read-only)"""
+        self._check_payment_settings()
+        key = self._render_key(code_obj)
+        detail = self._detail_cache.get(key) if key else None
+        if detail is None:
+            detail = self._render_code_detail(code_obj)
+            if key:
+                self._detail_cache.put(key, detail)
+        return detail
+    
+    def _render_code_summary(self, code_obj: Dict[str, Any]) -> Dict[str, Any]:
         """Format code for summary listing"""
         try:
             code = Code.from_raw(code_obj)
@@ -259,11 +972,13 @@ class CodeService:
                 "labels": code_obj.get("labels", []),
             }
     
-    def _format_code_detail(self, code_obj: Dict[str, Any]) -> Dict[str, Any]:
-        """Format code for detailed view with payments"""
+    def _render_code_detail(self, code_obj: Dict[str, Any]) -> Dict[str, Any]:
+        """Format code for detailed view with payments (read from the catalog's payment table when it has the code)"""
         try:
             code = Code.from_raw(code_obj)
-            return code.to_detail()
+            # The payment table holds CPT/HCPCS rows only; an ICD-10 code with the same string must not pick them up
+            payments = self.catalog.payment_table.get(code_obj["code"]) if code.normalized_type in PAYMENT_TYPES else None
+            return code.to_detail(payments)
         except Exception:
             # Fallback formatting
             return {
@@ -280,27 +995,55 @@ class CodeService:
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about loaded codes"""
         stats = {
-            "totalCodes": len(self.codes),
+            "version": self.version,
+            "effectiveDate": self.effective_date,
+            "totalCodes": len(self.lazy) if self.lazy is not None else len(self.codes),
             "isLoaded": self._is_loaded,
             "types": {},
             "loadMethod": "chunked" if self.manifest else "single-file",
+            "loadMode": "lazy" if self.lazy is not None else "eager",
+            "storageMode": self.catalog.storage_mode,
+            "loadPath": self.load_info.get("path"),
+            "loadTimeMs": self.load_info.get("timeMs"),
+            "chunkTimings": self.load_info.get("chunks", []),
         }
         
         if self.manifest:
+            report = self.catalog.chunk_report
+            stats["degraded"] = self.catalog.is_degraded
             stats["chunks"] = {
                 "count": self.manifest.get("chunkCount"),
                 "targetSizeMB": self.manifest.get("targetChunkSizeMB"),
                 "createdAt": self.manifest.get("createdAt"),
+                "loaded": len(report.get("loaded", [])),
+                "missing": report.get("missing", []),
+                "corrupt": report.get("corrupt", []),
             }
         
         for type_name, codes in self.type_index.items():
             stats["types"][type_name] = len(codes)
         
+        if self.lazy is not None:
+            stats["lazy"] = self.lazy.get_stats()
+        
+        stats["paymentTable"] = self.catalog.payment_table.get_stats()
+        stats["renderCache"] = {
+            "summary": self._summary_cache.get_stats(),
+            "detail": self._detail_cache.get_stats(),
+        }
+        
+        if self.versions:
+            stats["versions"] = {name: service.get_stats() for name, service in self.versions.items()}
+        
         return stats
     
     def is_ready(self) -> bool:
         """Check if service is ready"""
         return self._is_loaded and self.load_error is None
+    
+    def is_degraded(self) -> bool:
+        """Check if the service is serving a partial catalog (missing or corrupt chunks)"""
+        return self._is_loaded and self.catalog.is_degraded
 
 
 # Singleton instance
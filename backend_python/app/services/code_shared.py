@@ -0,0 +1,246 @@
+"""
+Shared Code Catalog
+Read-only catalog file that every uvicorn worker maps into memory instead of building its own copy.
+
+The file holds a compact catalog whose large buffers (record columns, posting lists,
+permutation arrays) live in one aligned data region. Workers mmap that region and wrap
+it in memoryviews, so the OS page cache keeps a single copy no matter how many workers run.
+Only the first worker builds the file (under a file lock); the others just attach to it.
+"""
+
+import asyncio
+import bisect
+import os
+import pickle
+import mmap
+from array import array
+from collections.abc import Mapping, Sequence
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not serialized, the atomic rename still keeps the file consistent
+    fcntl = None
+
+from app.services.code_catalog import CodeCatalog
+from app.services.code_snapshot import SNAPSHOT_VERSION
+
+
+MAGIC = b"RIMCAT\x00\x01"
+ALIGNMENT = 64
+MIN_SHARED_BYTES = 256  # bytes objects smaller than this stay in the pickled structure
+
+
+class PackedStrings(Sequence):
+    """Sorted strings stored as one UTF-8 blob plus offsets"""
+    
+    def __init__(self, offsets: array, blob: bytes):
+        self.offsets = offsets
+        self.blob = blob
+    
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "PackedStrings":
+        offsets = array("I", [0])
+        blob = bytearray()
+        for value in strings:
+            blob += value.encode("utf-8")
+            offsets.append(len(blob))
+        return cls(offsets, bytes(blob))
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, index: int) -> str:
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+    
+    def index_of(self, value: str) -> Optional[int]:
+        """Index of a string, or None if it is not present"""
+        index = bisect.bisect_left(self, value)
+        if index < len(self) and self[index] == value:
+            return index
+        return None
+
+
+class PackedPostings(Mapping):
+    """str -> int array mapping in CSR form: sorted keys, offsets and one flat values array"""
+    
+    def __init__(self, keys: PackedStrings, offsets: array, values: array):
+        self.keys_table = keys
+        self.offsets = offsets
+        self.values = values
+    
+    @classmethod
+    def from_dict(cls, mapping: Dict[str, Iterable[int]]) -> "PackedPostings":
+        keys = sorted(mapping)
+        offsets = array("I", [0])
+        values = array("i")
+        for key in keys:
+            values.extend(mapping[key])
+            offsets.append(len(values))
+        return cls(PackedStrings.from_strings(keys), offsets, values)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self.keys_table.index_of(key)
+        if index is None:
+            return default
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+    
+    def __getitem__(self, key: str) -> Any:
+        result = self.get(key)
+        if result is None:
+            raise KeyError(key)
+        return result
+    
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.keys_table.index_of(key) is not None
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys_table)
+    
+    def __len__(self) -> int:
+        return len(self.keys_table)
+
+
+class InternedStrings(Sequence):
+    """List of repeated strings stored as small integer ids into a name table"""
+    
+    def __init__(self, ids: array, names: List[str]):
+        self.ids = ids
+        self.names = names
+    
+    @classmethod
+    def from_values(cls, values: Iterable[str]) -> "InternedStrings":
+        lookup: Dict[str, int] = {}
+        ids = array("H")
+        for value in values:
+            if value not in lookup:
+                lookup[value] = len(lookup)
+            ids.append(lookup[value])
+        return cls(ids, list(lookup))
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __getitem__(self, index: int) -> str:
+        if isinstance(index, slice):
+            return [self.names[type_id] for type_id in self.ids[index]]
+        return self.names[self.ids[index]]
+
+
+def pack_catalog(catalog: CodeCatalog) -> None:
+    """Replace the search index's dicts of small arrays with flat CSR structures (in place)"""
+    index = catalog.search_index
+    index.postings = PackedPostings.from_dict(index.postings)
+    index.code_positions = PackedPostings.from_dict(index.code_positions)
+    index.grams = PackedPostings.from_dict(index.grams)
+    index.vocabulary = PackedStrings.from_strings(index.vocabulary)
+    index.types = InternedStrings.from_values(index.types)
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class _BufferPickler(pickle.Pickler):
+    """Pickler that moves arrays and large bytes objects out of line into the data region"""
+    
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.buffers: List[tuple] = []  # (offset, buffer)
+        self.size = 0
+    
+    def persistent_id(self, obj: Any) -> Optional[tuple]:
+        if type(obj) is array:
+            typecode, nbytes = obj.typecode, len(obj) * obj.itemsize
+        elif type(obj) is bytes and len(obj) >= MIN_SHARED_BYTES:
+            typecode, nbytes = "B", len(obj)
+        else:
+            return None
+        offset = _align(self.size)
+        self.buffers.append((offset, obj))
+        self.size = offset + nbytes
+        return ("buffer", typecode, offset, len(obj))
+
+
+class _BufferUnpickler(pickle.Unpickler):
+    """Unpickler that resolves out-of-line buffers to memoryviews over the mapped data region"""
+    
+    def __init__(self, file, data: memoryview):
+        super().__init__(file)
+        self.data = data
+    
+    def persistent_load(self, pid: tuple) -> memoryview:
+        _, typecode, offset, length = pid
+        view = self.data[offset:offset + length * array(typecode).itemsize]
+        return view if typecode == "B" else view.cast(typecode)
+
+
+def write_shared(shared_path: Path, fingerprint: Dict[str, Any], catalog: CodeCatalog) -> None:
+    """Pack a compact catalog and write it as a shared catalog file (temp file + rename)"""
+    pack_catalog(catalog)
+    tmp_path = shared_path.with_name(f"{shared_path.name}.{os.getpid()}.tmp")
+    header = {"version": SNAPSHOT_VERSION, "fingerprint": fingerprint}
+    
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(bytes(8))  # data region offset, filled in below
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickler = _BufferPickler(f)
+            pickler.dump(catalog)
+            
+            data_offset = _align(f.tell())
+            for offset, buffer in pickler.buffers:
+                f.seek(data_offset + offset)
+                f.write(buffer)
+            f.truncate(data_offset + _align(pickler.size))
+            
+            f.seek(len(MAGIC))
+            f.write(data_offset.to_bytes(8, "little"))
+        os.replace(tmp_path, shared_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def attach_shared(shared_path: Path, fingerprint: Dict[str, Any]) -> Optional[CodeCatalog]:
+    """Map a shared catalog file read-only if it exists and matches the fingerprint"""
+    if not shared_path.exists():
+        return None
+    
+    with open(shared_path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        data_offset = int.from_bytes(f.read(8), "little")
+        header = pickle.load(f)
+        if header.get("version") != SNAPSHOT_VERSION or header.get("fingerprint") != fingerprint:
+            return None
+        
+        # The memoryviews keep the mapping alive after the file is closed
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return _BufferUnpickler(f, memoryview(mapped)[data_offset:]).load()
+
+
+@asynccontextmanager
+async def shared_build_lock(shared_path: Path, poll_seconds: float = 0.1):
+    """
+    Exclusive lock held while one worker builds the shared catalog file.
+    Waiting workers poll the lock instead of blocking so their event loop keeps serving requests.
+    """
+    if fcntl is None:
+        yield
+        return
+    
+    with open(shared_path.with_name(f"{shared_path.name}.lock"), "a+b") as lock_file:
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                await asyncio.sleep(poll_seconds)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
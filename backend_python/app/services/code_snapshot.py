@@ -0,0 +1,81 @@
+"""
+Code Catalog Snapshot
+Precompiled on-disk snapshot of the code catalog and its indexes.
+The snapshot is keyed by a fingerprint of manifest.json and the chunk files (size + mtime),
+so it is only used while the JSON sources it was built from are unchanged.
+"""
+
+import gc
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from app.services.code_catalog import CodeCatalog
+
+
+# Bump whenever the layout of CodeCatalog changes so old snapshots are rebuilt
+SNAPSHOT_VERSION = 11
+
+
+def _file_signature(path: Path) -> Optional[list]:
+    """Get [size, mtime_ns] for a file, or None if it does not exist"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def compute_fingerprint(
+    chunks_dir: Path,
+    manifest: Dict[str, Any],
+    manifest_path: Path,
+    storage_mode: str = "dict"
+) -> Dict[str, Any]:
+    """Fingerprint manifest.json, every chunk file it lists and the storage mode"""
+    return {
+        "storage": storage_mode,
+        "manifest": _file_signature(manifest_path),
+        "chunks": {
+            chunk["fileName"]: _file_signature(chunks_dir / chunk["fileName"])
+            for chunk in manifest.get("chunks", [])
+        },
+    }
+
+
+def load_snapshot(snapshot_path: Path, fingerprint: Dict[str, Any]) -> Optional[CodeCatalog]:
+    """Load the catalog from a snapshot if it exists and matches the fingerprint"""
+    if not snapshot_path.exists():
+        return None
+    
+    with open(snapshot_path, "rb") as f:
+        header = pickle.load(f)
+        if header.get("version") != SNAPSHOT_VERSION or header.get("fingerprint") != fingerprint:
+            return None
+        
+        # The catalog is a large graph of small objects; the cyclic GC only slows unpickling down
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            catalog = pickle.load(f)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    
+    return catalog
+
+
+def write_snapshot(snapshot_path: Path, fingerprint: Dict[str, Any], catalog: CodeCatalog) -> None:
+    """Write the catalog snapshot atomically (temp file + rename)"""
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    header = {"version": SNAPSHOT_VERSION, "fingerprint": fingerprint}
+    
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
@@ -0,0 +1,321 @@
+"""
+Compact Code Store
+Columnar, read-only storage for catalog records.
+
+Instead of one dict per code (plus nested metadata dicts), records are kept as:
+- code / description: UTF-8 blobs with offset arrays
+- type / labels: interned string tables referenced by integer ids
+- metadata: compact JSON blob, decoded only when a record's metadata is accessed
+
+Records are exposed as lightweight read-only mappings so the rest of the service
+can keep using code_obj["code"] / code_obj.get("description") unchanged.
+"""
+
+import bisect
+import json
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Presence flags for optional record fields
+HAS_DESCRIPTION = 1
+HAS_LABELS = 2
+HAS_TYPE = 4
+HAS_METADATA = 8
+
+_FIELD_FLAGS = (
+    ("description", HAS_DESCRIPTION),
+    ("labels", HAS_LABELS),
+    ("type", HAS_TYPE),
+    ("metadata", HAS_METADATA),
+)
+
+
+def _is_regular(record: Dict[str, Any]) -> bool:
+    """Check whether a record fits the columnar schema exactly"""
+    if not isinstance(record.get("code"), str):
+        return False
+    for key, value in record.items():
+        if key == "code" or key == "metadata":
+            continue
+        if key in ("description", "type"):
+            if not isinstance(value, str):
+                return False
+        elif key == "labels":
+            if not isinstance(value, list) or not all(isinstance(label, str) for label in value):
+                return False
+        else:
+            return False
+    return True
+
+
+class CompactRecord(Mapping):
+    """Read-only view of one record in a CompactCodeStore"""
+    
+    __slots__ = ("_store", "_position")
+    
+    def __init__(self, store: "CompactCodeStore", position: int):
+        self._store = store
+        self._position = position
+    
+    def __getitem__(self, key: str) -> Any:
+        store = self._store
+        position = self._position
+        if key == "code":
+            return store.code(position)
+        
+        flags = store.flags[position]
+        if key == "description" and flags & HAS_DESCRIPTION:
+            return store.description(position)
+        if key == "labels" and flags & HAS_LABELS:
+            return store.labels(position)
+        if key == "type" and flags & HAS_TYPE:
+            return store.type_names[store.type_ids[position]]
+        if key == "metadata" and flags & HAS_METADATA:
+            return store.metadata(position)
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        yield "code"
+        flags = self._store.flags[self._position]
+        for key, flag in _FIELD_FLAGS:
+            if flags & flag:
+                yield key
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return f"CompactRecord({dict(self)!r})"
+
+
+class CompactCodeStore(Sequence):
+    """
+    Columnar storage for catalog records, indexable like the list of record dicts it replaces.
+    Columns may also be memoryviews over a mapped shared catalog file (see code_shared).
+    """
+    
+    def __init__(self):
+        self.code_offsets = array("I", [0])
+        self.code_blob = b""
+        self.description_offsets = array("I", [0])
+        self.description_blob = b""
+        self.metadata_offsets = array("Q", [0])
+        self.metadata_blob = b""
+        self.label_offsets = array("I", [0])
+        self.label_ids = array("I")
+        self.label_names: List[str] = []
+        self.type_ids = array("H")
+        self.type_names: List[str] = []
+        self.flags = array("B")
+        self.irregular: Dict[int, Dict[str, Any]] = {}  # position -> record that does not fit the schema
+    
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "CompactCodeStore":
+        """Build a store from record dicts (the dicts can be discarded afterwards)"""
+        builder = CompactStoreBuilder()
+        for record in records:
+            builder.add(record)
+        return builder.build()
+    
+    @classmethod
+    def from_sources(cls, sources: Iterable[Tuple[Sequence, int, int]]) -> "CompactCodeStore":
+        """
+        Build a store from (records, start, end) ranges in order. Ranges of another CompactCodeStore
+        (e.g. unchanged chunks on reload) are copied column by column without decoding records.
+        """
+        builder = CompactStoreBuilder()
+        for records, start, end in sources:
+            if isinstance(records, CompactCodeStore):
+                builder.add_range(records, start, end)
+            else:
+                for position in range(start, end):
+                    builder.add(records[position])
+        return builder.build()
+    
+    def __len__(self) -> int:
+        return len(self.flags)
+    
+    def __getitem__(self, position: int) -> Mapping:
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("CompactCodeStore index out of range")
+        irregular = self.irregular.get(position)
+        if irregular is not None:
+            return irregular
+        return CompactRecord(self, position)
+    
+    def __iter__(self) -> Iterator[Mapping]:
+        for position in range(len(self)):
+            yield self[position]
+    
+    def code(self, position: int) -> str:
+        irregular = self.irregular.get(position)
+        if irregular is not None:
+            return str(irregular.get("code", ""))
+        return str(self.code_blob[self.code_offsets[position]:self.code_offsets[position + 1]], "utf-8")
+    
+    def description(self, position: int) -> str:
+        return str(self.description_blob[self.description_offsets[position]:self.description_offsets[position + 1]], "utf-8")
+    
+    def labels(self, position: int) -> List[str]:
+        label_names = self.label_names
+        return [label_names[i] for i in self.label_ids[self.label_offsets[position]:self.label_offsets[position + 1]]]
+    
+    def metadata(self, position: int) -> Any:
+        return json.loads(bytes(self.metadata_blob[self.metadata_offsets[position]:self.metadata_offsets[position + 1]]))
+
+
+class CompactStoreBuilder:
+    """Accumulates records (or ranges of existing stores) into the columns of a new CompactCodeStore"""
+    
+    def __init__(self):
+        self.store = CompactCodeStore()
+        self.code_blob = bytearray()
+        self.description_blob = bytearray()
+        self.metadata_blob = bytearray()
+        self.label_lookup: Dict[str, int] = {}
+        self.type_lookup: Dict[str, int] = {}
+    
+    def _label_id(self, label: str) -> int:
+        if label not in self.label_lookup:
+            self.label_lookup[label] = len(self.store.label_names)
+            self.store.label_names.append(label)
+        return self.label_lookup[label]
+    
+    def _type_id(self, code_type: str) -> int:
+        if code_type not in self.type_lookup:
+            self.type_lookup[code_type] = len(self.store.type_names)
+            self.store.type_names.append(code_type)
+        return self.type_lookup[code_type]
+    
+    def add(self, record: Mapping) -> None:
+        """Append one record"""
+        store = self.store
+        flags = 0
+        if not _is_regular(record):
+            store.irregular[len(store)] = record
+            record = {"code": str(record.get("code", ""))}
+        
+        self.code_blob += record["code"].encode("utf-8")
+        
+        if "description" in record:
+            flags |= HAS_DESCRIPTION
+            self.description_blob += record["description"].encode("utf-8")
+        
+        if "labels" in record:
+            flags |= HAS_LABELS
+            for label in record["labels"]:
+                store.label_ids.append(self._label_id(label))
+        
+        type_id = 0
+        if "type" in record:
+            flags |= HAS_TYPE
+            type_id = self._type_id(record["type"])
+        
+        if "metadata" in record:
+            flags |= HAS_METADATA
+            self.metadata_blob += json.dumps(record["metadata"], separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        
+        store.code_offsets.append(len(self.code_blob))
+        store.description_offsets.append(len(self.description_blob))
+        store.metadata_offsets.append(len(self.metadata_blob))
+        store.label_offsets.append(len(store.label_ids))
+        store.type_ids.append(type_id)
+        store.flags.append(flags)
+    
+    def add_range(self, source: CompactCodeStore, start: int, end: int) -> None:
+        """Append records [start, end) of another store by copying its column slices"""
+        store = self.store
+        base = len(store)
+        
+        for offsets, blob, source_offsets, source_blob in (
+            (store.code_offsets, self.code_blob, source.code_offsets, source.code_blob),
+            (store.description_offsets, self.description_blob, source.description_offsets, source.description_blob),
+            (store.metadata_offsets, self.metadata_blob, source.metadata_offsets, source.metadata_blob),
+        ):
+            first = source_offsets[start]
+            shift = len(blob) - first
+            blob += source_blob[first:source_offsets[end]]
+            offsets.extend(offset + shift for offset in source_offsets[start + 1:end + 1])
+        
+        label_map = [self._label_id(label) for label in source.label_names]
+        label_shift = len(store.label_ids) - source.label_offsets[start]
+        store.label_ids.extend(label_map[label_id] for label_id in source.label_ids[source.label_offsets[start]:source.label_offsets[end]])
+        store.label_offsets.extend(offset + label_shift for offset in source.label_offsets[start + 1:end + 1])
+        
+        type_map = [self._type_id(code_type) for code_type in source.type_names]
+        store.type_ids.extend(type_map[type_id] if flags & HAS_TYPE else 0 for type_id, flags in zip(source.type_ids[start:end], source.flags[start:end]))
+        store.flags.extend(source.flags[start:end])
+        
+        for position, record in source.irregular.items():
+            if start <= position < end:
+                store.irregular[position - start + base] = record
+    
+    def build(self) -> CompactCodeStore:
+        store = self.store
+        store.code_blob = bytes(self.code_blob)
+        store.description_blob = bytes(self.description_blob)
+        store.metadata_blob = bytes(self.metadata_blob)
+        return store
+
+
+class CompactCodeIndex(Mapping):
+    """code -> record mapping over a CompactCodeStore, using a code-sorted permutation and bisect"""
+    
+    def __init__(self, store: CompactCodeStore):
+        self.store = store
+        self.order = array("i", sorted(range(len(store)), key=lambda p: (store.code(p), p)))
+        self._size = sum(
+            1 for i in range(len(self.order))
+            if i == 0 or store.code(self.order[i]) != store.code(self.order[i - 1])
+        )
+    
+    def position(self, code: str) -> Optional[int]:
+        """Position of a code (the last occurrence, like dict assignment), or None"""
+        if not isinstance(code, str):
+            return None
+        index = bisect.bisect_right(self.order, code, key=self.store.code) - 1
+        if index >= 0 and self.store.code(self.order[index]) == code:
+            return self.order[index]
+        return None
+    
+    def __getitem__(self, code: str) -> Mapping:
+        position = self.position(code)
+        if position is None:
+            raise KeyError(code)
+        return self.store[position]
+    
+    def __contains__(self, code: object) -> bool:
+        return self.position(code) is not None
+    
+    def __iter__(self) -> Iterator[str]:
+        previous = None
+        for position in self.order:
+            code = self.store.code(position)
+            if code != previous:
+                yield code
+                previous = code
+    
+    def __len__(self) -> int:
+        return self._size
+
+
+class CompactRecordList(Sequence):
+    """Sequence of records at given positions of a CompactCodeStore (a type_index bucket)"""
+    
+    def __init__(self, store: CompactCodeStore, positions: array):
+        self.store = store
+        self.positions = positions
+    
+    def __len__(self) -> int:
+        return len(self.positions)
+    
+    def __getitem__(self, index: int) -> Mapping:
+        if isinstance(index, slice):
+            return [self.store[p] for p in self.positions[index]]
+        return self.store[self.positions[index]]
@@ -5,45 +5,34 @@ New Technology Add-on Payment (NTAP) and Transitional Pass-Through (TPT) program
 """
 
 import json
-from typing import Dict, List, Any, Optional
-from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional
 from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
 
 from app.config import settings
+from app.services.reference_data import reference_data
 
 
-# Data storage
-_ntap_data: Optional[Dict[str, Any]] = None
-_tpt_data: Optional[Dict[str, Any]] = None
+def _or_default(value: Any, default: Any) -> Any:
+    """A program parameter, or the configured default when the reference data leaves it out"""
+    return default if value is None else value
 
 
-def _get_data_path() -> Path:
-    """Get the path to the data directory"""
-    current_dir = Path(__file__).parent.parent.parent
-    data_dir = current_dir / "data"
-    
-    # If not found, check the original backend's data directory
-    if not data_dir.exists():
-        data_dir = current_dir.parent / "backend" / "data"
-    
-    return data_dir
+@lru_cache(maxsize=4096)
+def _parse_fda_date(fda_approval_date: Optional[str]) -> Optional[datetime]:
+    """FDA approval date as a naive datetime, or None if it is missing or not ISO formatted"""
+    try:
+        return datetime.fromisoformat(fda_approval_date.replace("Z", "+00:00")).replace(tzinfo=None)
+    except (AttributeError, TypeError, ValueError):
+        return None
 
 
-def _load_data() -> None:
-    """Load mock data files"""
-    global _ntap_data, _tpt_data
-    
-    data_path = _get_data_path()
-    
-    if _ntap_data is None:
-        ntap_path = data_path / "ntap_approved.json"
-        with open(ntap_path, "r", encoding="utf-8") as f:
-            _ntap_data = json.load(f)
-    
-    if _tpt_data is None:
-        tpt_path = data_path / "tpt_approved.json"
-        with open(tpt_path, "r", encoding="utf-8") as f:
-            _tpt_data = json.load(f)
+def _years_since(fda_approval_date: Optional[str], now: datetime) -> float:
+    """Years between the FDA approval date and now (0 when the date cannot be parsed)"""
+    fda_date = _parse_fda_date(fda_approval_date) or now
+    return (now - fda_date).days / 365.25
 
 
 # ============================================
@@ -55,14 +44,14 @@ def calculate_ntap_payment(params: Dict[str, Any]) -> Dict[str, Any]:
     Calculate NTAP payment for a technology
     Formula: NTAP = min(65% × (device_cost - DRG_payment), max_cap)
     """
-    _load_data()
+    ntap = reference_data.get_ntap_program()
     
     device_cost = params.get("deviceCost")
     drg_code = params.get("drgCode")
     provided_drg_payment = params.get("drgPayment")
     
     # Get DRG base payment from data or use provided value
-    drg_payment = provided_drg_payment or _ntap_data.get("drgBasePayments", {}).get(drg_code, 0)
+    drg_payment = provided_drg_payment or ntap.drgBasePayments.get(drg_code, 0)
     
     if not device_cost or device_cost <= 0:
         return {
@@ -71,8 +60,9 @@ def calculate_ntap_payment(params: Dict[str, Any]) -> Dict[str, Any]:
         }
     
     # NTAP calculation parameters
-    ntap_percentage = _ntap_data.get("ntapPercentage", settings.ntap_percentage)
-    max_cap = _ntap_data.get("maxNtapCap", settings.ntap_max_cap)
+    ntap_percentage = _or_default(ntap.ntapPercentage, settings.ntap_percentage)
+    max_cap = _or_default(ntap.maxNtapCap, settings.ntap_max_cap)
+    approved_technologies = [reference_data.to_reference(t) for t in reference_data.technologies_for_drg(drg_code)]
     
     # Calculate the cost difference
     cost_difference = device_cost - drg_payment
@@ -87,6 +77,7 @@ def calculate_ntap_payment(params: Dict[str, Any]) -> Dict[str, Any]:
             "costDifference": cost_difference,
             "ntapPayment": 0,
             "reason": "Device cost does not exceed DRG payment",
+            "approvedTechnologies": approved_technologies,
         }
     
     # Calculate NTAP payment
@@ -109,12 +100,78 @@ def calculate_ntap_payment(params: Dict[str, Any]) -> Dict[str, Any]:
             "ntapAddOn": round(ntap_payment),
             "total": round(drg_payment + ntap_payment),
         },
+        "approvedTechnologies": approved_technologies,
     }
 
 
-def check_ntap_eligibility(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Check NTAP eligibility based on criteria"""
-    _load_data()
+def calculate_ntap_payment_grid(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calculate NTAP payments for every device cost x DRG pair in one vectorized pass
+    Same formula and rounding as calculate_ntap_payment; returned as rows (device costs) x columns (DRGs).
+    params: deviceCosts, drgCodes and/or drgPayments (explicit DRG payments, positionally overriding drgCodes),
+    or technologyId to price a technology across its applicableDRGs (and at its deviceCost if none are given)
+    """
+    ntap = reference_data.get_ntap_program()
+    
+    device_costs = list(params.get("deviceCosts") or [])
+    drg_codes = list(params.get("drgCodes") or [])
+    provided_drg_payments = list(params.get("drgPayments") or [])
+    
+    technology_id = params.get("technologyId")
+    if technology_id:
+        technology = reference_data.get_technology(technology_id)
+        if technology is None or reference_data.program_of(technology) != "NTAP":
+            return {"error": True, "message": f"NTAP technology not found: {technology_id}"}
+        drg_codes = drg_codes or list(technology.applicableDRGs)
+        if not device_costs and technology.deviceCost:
+            device_costs = [technology.deviceCost]
+    
+    if not device_costs or any(not cost or cost <= 0 for cost in device_costs):
+        return {"error": True, "message": "Device costs are required and must be positive"}
+    if provided_drg_payments and drg_codes and len(provided_drg_payments) != len(drg_codes):
+        return {"error": True, "message": "drgPayments must have one entry per DRG code"}
+    
+    columns = max(len(drg_codes), len(provided_drg_payments))
+    if not columns:
+        return {"error": True, "message": "At least one DRG code or DRG payment is required"}
+    if len(device_costs) * columns > settings.payment_grid_max_cells:
+        return {"error": True, "message": f"Too many cells: device costs x DRGs must be at most {settings.payment_grid_max_cells}"}
+    
+    # One column per DRG: explicit payment if given (and non-zero), else the DRG base payment
+    drg_codes = drg_codes or [None] * columns
+    drg_payments = []
+    unknown_drgs = []
+    for column, drg_code in enumerate(drg_codes):
+        provided = provided_drg_payments[column] if provided_drg_payments else None
+        if not provided and drg_code is not None and drg_code not in ntap.drgBasePayments:
+            unknown_drgs.append(drg_code)
+        drg_payments.append(provided or ntap.drgBasePayments.get(drg_code, 0))
+    
+    ntap_percentage = _or_default(ntap.ntapPercentage, settings.ntap_percentage)
+    max_cap = _or_default(ntap.maxNtapCap, settings.ntap_max_cap)
+    
+    drg_payment = np.array(drg_payments, dtype=np.float64)
+    cost_difference = np.array(device_costs, dtype=np.float64)[:, None] - drg_payment
+    eligible = cost_difference > 0
+    ntap_payment = np.where(eligible, np.minimum(cost_difference * ntap_percentage, max_cap), 0)
+    
+    return {
+        "ntapPercentage": ntap_percentage * 100,
+        "maxCap": max_cap,
+        "deviceCosts": device_costs,
+        "drgCodes": drg_codes,
+        "drgPayments": drg_payments,
+        "unknownDrgs": list(dict.fromkeys(unknown_drgs)),
+        "eligible": eligible.tolist(),
+        "ntapPayment": np.rint(ntap_payment).astype(np.int64).tolist(),
+        "totalReimbursement": np.rint(drg_payment + ntap_payment).astype(np.int64).tolist(),
+        "capped": (eligible & (cost_difference * ntap_percentage > max_cap)).tolist(),
+    }
+
+
+def check_ntap_eligibility(params: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Check NTAP eligibility based on criteria (now: evaluation time, defaults to the current time)"""
+    ntap = reference_data.get_ntap_program()
     
     device_name = params.get("deviceName")
     manufacturer = params.get("manufacturer")
@@ -129,13 +186,7 @@ def check_ntap_eligibility(params: Dict[str, Any]) -> Dict[str, Any]:
     needs_review = False
     
     # 1. Check FDA approval date (must be within 2-3 years)
-    try:
-        fda_date = datetime.fromisoformat(fda_approval_date.replace("Z", "+00:00"))
-    except:
-        fda_date = datetime.now()
-    
-    now = datetime.now()
-    years_old = (now - fda_date.replace(tzinfo=None)).days / 365.25
+    years_old = _years_since(fda_approval_date, now or datetime.now())
     
     newness_criteria = {
         "criterion": "Newness",
@@ -148,8 +199,8 @@ def check_ntap_eligibility(params: Dict[str, Any]) -> Dict[str, Any]:
         overall_eligible = False
     
     # 2. Check cost threshold
-    drg_payment = _ntap_data.get("drgBasePayments", {}).get(drg_code, 0)
-    cost_threshold_multiplier = _ntap_data.get("costThresholdMultiplier", settings.ntap_cost_threshold_multiplier)
+    drg_payment = ntap.drgBasePayments.get(drg_code, 0)
+    cost_threshold_multiplier = _or_default(ntap.costThresholdMultiplier, settings.ntap_cost_threshold_multiplier)
     cost_threshold = drg_payment * cost_threshold_multiplier
     meets_threshold = device_cost > cost_threshold
     
@@ -174,28 +225,21 @@ def check_ntap_eligibility(params: Dict[str, Any]) -> Dict[str, Any]:
     needs_review = True
     
     # 4. Check substantial clinical improvement
-    clinical_improvement_categories = [
-        "Reduced mortality",
-        "Reduced complications",
-        "Reduced hospital stay",
-        "Improved patient outcomes",
-        "Reduced readmissions",
-        "Treatment for unmet need",
-    ]
-    
-    valid_improvements = [
-        imp for imp in clinical_improvements
-        if any(
-            cat.lower() in imp.lower() or imp.lower() in cat.lower()
-            for cat in clinical_improvement_categories
-        )
-    ]
+    matcher = reference_data.get_clinical_matcher()
+    matched_categories: Dict[str, None] = {}
+    valid_improvements = []
+    for imp in clinical_improvements:
+        categories = matcher.categories_in(imp)
+        if categories:
+            valid_improvements.append(imp)
+            matched_categories.update(dict.fromkeys(categories))
     
     clinical_criteria = {
         "criterion": "Substantial Clinical Improvement",
         "description": "Demonstrates meaningful clinical benefit over existing treatments",
         "met": len(valid_improvements) > 0,
         "details": f"Claims: {', '.join(valid_improvements)}" if valid_improvements else "No clinical improvement claims provided - documentation required",
+        "matchedCategories": list(matched_categories),
     }
     eligibility_criteria.append(clinical_criteria)
     if not clinical_criteria["met"]:
@@ -233,6 +277,19 @@ def check_ntap_eligibility(params: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def match_clinical_improvements(claims: List[str]) -> List[Dict[str, Any]]:
+    """Clinical improvement categories each claim refers to, with the text spans of the phrases found in it"""
+    matcher = reference_data.get_clinical_matcher()
+    return [
+        {
+            "claim": claim,
+            "categories": matcher.categories_in(claim),
+            "matches": matcher.find(claim),
+        }
+        for claim in claims
+    ]
+
+
 def _generate_ntap_recommendations(criteria: List[Dict[str, Any]], status: str) -> List[str]:
     """Generate recommendations based on eligibility criteria"""
     recommendations = []
@@ -256,12 +313,12 @@ def _generate_ntap_recommendations(criteria: List[Dict[str, Any]], status: str)
 
 def get_approved_ntap_technologies() -> Dict[str, Any]:
     """Get list of approved NTAP technologies"""
-    _load_data()
+    ntap = reference_data.get_ntap_program()
     return {
-        "fiscalYear": _ntap_data.get("fiscalYear"),
-        "lastUpdated": _ntap_data.get("lastUpdated"),
-        "technologies": _ntap_data.get("technologies"),
-        "totalCount": len(_ntap_data.get("technologies", [])),
+        "fiscalYear": ntap.fiscalYear,
+        "lastUpdated": ntap.lastUpdated,
+        "technologies": [technology.model_dump(exclude_unset=True) for technology in ntap.technologies],
+        "totalCount": len(ntap.technologies),
     }
 
 
@@ -274,14 +331,14 @@ def calculate_tpt_payment(params: Dict[str, Any]) -> Dict[str, Any]:
     Calculate TPT (Transitional Pass-Through) payment
     Formula: TPT = device_cost - packaged_APC_payment
     """
-    _load_data()
+    tpt = reference_data.get_tpt_program()
     
     device_cost = params.get("deviceCost")
     apc_code = params.get("apcCode")
     provided_packaged_payment = params.get("packagedPayment")
     
     # Get APC base payment from data or use provided value
-    apc_payment = provided_packaged_payment or _tpt_data.get("apcBasePayments", {}).get(apc_code, 0)
+    apc_payment = provided_packaged_payment or tpt.apcBasePayments.get(apc_code, 0)
     
     if not device_cost or device_cost <= 0:
         return {
@@ -304,12 +361,96 @@ def calculate_tpt_payment(params: Dict[str, Any]) -> Dict[str, Any]:
             "devicePassThrough": round(pass_through_payment),
             "total": round(apc_payment + pass_through_payment),
         },
+        "approvedTechnologies": [reference_data.to_reference(t) for t in reference_data.technologies_for_apc(apc_code)],
     }
 
 
-def check_tpt_eligibility(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Check TPT eligibility"""
-    _load_data()
+def calculate_tpt_payment_grid(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calculate TPT payments for every device cost x APC pair in one vectorized pass
+    Same formula and rounding as calculate_tpt_payment; returned as rows (device costs) x columns (APCs).
+    params: deviceCosts (optionally labelled by productNames), apcCodes and/or packagedPayments
+    (explicit APC payments, positionally overriding apcCodes; every APC with a base payment when both are empty),
+    includeSummary for a per-product summary
+    """
+    tpt = reference_data.get_tpt_program()
+    
+    device_costs = list(params.get("deviceCosts") or [])
+    product_names = list(params.get("productNames") or [])
+    apc_codes = list(params.get("apcCodes") or [])
+    provided_apc_payments = list(params.get("packagedPayments") or [])
+    
+    if not device_costs or any(not cost or cost <= 0 for cost in device_costs):
+        return {"error": True, "message": "Device costs are required and must be positive"}
+    if product_names and len(product_names) != len(device_costs):
+        return {"error": True, "message": "productNames must have one entry per device cost"}
+    if provided_apc_payments and apc_codes and len(provided_apc_payments) != len(apc_codes):
+        return {"error": True, "message": "packagedPayments must have one entry per APC code"}
+    if not apc_codes and not provided_apc_payments:
+        apc_codes = list(tpt.apcBasePayments)
+    
+    columns = max(len(apc_codes), len(provided_apc_payments))
+    if not columns:
+        return {"error": True, "message": "At least one APC code or packaged payment is required"}
+    if len(device_costs) * columns > settings.payment_grid_max_cells:
+        return {"error": True, "message": f"Too many cells: device costs x APCs must be at most {settings.payment_grid_max_cells}"}
+    
+    # One column per APC: explicit payment if given (and non-zero), else the APC base payment
+    apc_codes = apc_codes or [None] * columns
+    apc_payments = []
+    unknown_apcs = []
+    for column, apc_code in enumerate(apc_codes):
+        provided = provided_apc_payments[column] if provided_apc_payments else None
+        if not provided and apc_code is not None and apc_code not in tpt.apcBasePayments:
+            unknown_apcs.append(apc_code)
+        apc_payments.append(provided or tpt.apcBasePayments.get(apc_code, 0))
+    
+    apc_payment = np.array(apc_payments, dtype=np.float64)
+    packaged = apc_payment * 0.1  # Packaged portion is ~10% of APC
+    pass_through = np.maximum(0, np.array(device_costs, dtype=np.float64)[:, None] - packaged)
+    pass_through_payment = np.rint(pass_through).astype(np.int64)
+    total_reimbursement = np.rint(apc_payment + pass_through).astype(np.int64)
+    
+    result = {
+        "deviceCosts": device_costs,
+        "apcCodes": apc_codes,
+        "apcPayments": apc_payments,
+        "unknownApcs": list(dict.fromkeys(unknown_apcs)),
+        "packagedAmount": np.rint(packaged).astype(np.int64).tolist(),
+        "passThroughPayment": pass_through_payment.tolist(),
+        "totalReimbursement": total_reimbursement.tolist(),
+    }
+    if product_names:
+        result["productNames"] = product_names
+    
+    if params.get("includeSummary"):
+        # Per product (row): where it is reimbursed best and worst, and its average pass-through
+        best = total_reimbursement.argmax(axis=1).tolist()
+        worst = total_reimbursement.argmin(axis=1).tolist()
+        best_total = total_reimbursement.max(axis=1).tolist()
+        worst_total = total_reimbursement.min(axis=1).tolist()
+        mean_pass_through = pass_through.mean(axis=1).round(2).tolist()
+        result["summary"] = [
+            {
+                "product": product_names[row] if product_names else None,
+                "deviceCost": device_costs[row],
+                "bestApc": apc_codes[best[row]],
+                "bestApcPayment": apc_payments[best[row]],
+                "bestTotalReimbursement": best_total[row],
+                "worstApc": apc_codes[worst[row]],
+                "worstApcPayment": apc_payments[worst[row]],
+                "worstTotalReimbursement": worst_total[row],
+                "meanPassThroughPayment": mean_pass_through[row],
+            }
+            for row in range(len(device_costs))
+        ]
+    
+    return result
+
+
+def check_tpt_eligibility(params: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Check TPT eligibility (now: evaluation time, defaults to the current time)"""
+    tpt = reference_data.get_tpt_program()
     
     device_name = params.get("deviceName")
     manufacturer = params.get("manufacturer")
@@ -324,14 +465,8 @@ def check_tpt_eligibility(params: Dict[str, Any]) -> Dict[str, Any]:
     needs_review = False
     
     # 1. Check FDA approval date (must be recent)
-    try:
-        fda_date = datetime.fromisoformat(fda_approval_date.replace("Z", "+00:00"))
-    except:
-        fda_date = datetime.now()
-    
-    now = datetime.now()
-    years_old = (now - fda_date.replace(tzinfo=None)).days / 365.25
-    max_duration = _tpt_data.get("maxPassThroughDuration", settings.tpt_max_pass_through_duration)
+    years_old = _years_since(fda_approval_date, now or datetime.now())
+    max_duration = _or_default(tpt.maxPassThroughDuration, settings.tpt_max_pass_through_duration)
     
     newness_criteria = {
         "criterion": "Newness",
@@ -356,7 +491,7 @@ def check_tpt_eligibility(params: Dict[str, Any]) -> Dict[str, Any]:
         overall_eligible = False
     
     # 3. Check cost significance
-    apc_payment = _tpt_data.get("apcBasePayments", {}).get(apc_code, 0)
+    apc_payment = tpt.apcBasePayments.get(apc_code, 0)
     cost_significant = apc_payment > 0 and device_cost > (apc_payment * 0.15)
     
     cost_criteria = {
@@ -429,16 +564,92 @@ def _generate_tpt_recommendations(criteria: List[Dict[str, Any]], status: str) -
 
 def get_approved_tpt_technologies() -> Dict[str, Any]:
     """Get list of approved TPT technologies"""
-    _load_data()
+    tpt = reference_data.get_tpt_program()
+    return {
+        "fiscalYear": tpt.fiscalYear,
+        "lastUpdated": tpt.lastUpdated,
+        "maxDuration": _or_default(tpt.maxPassThroughDuration, settings.tpt_max_pass_through_duration),
+        "technologies": [technology.model_dump(exclude_unset=True) for technology in tpt.technologies],
+        "totalCount": len(tpt.technologies),
+    }
+
+
+# ============================================
+# PORTFOLIO SCREENING
+# ============================================
+
+ELIGIBILITY_STATUSES = ("likely_eligible", "needs_review", "not_eligible")
+
+
+def screen_eligibility(program: str, products: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Check NTAP or TPT eligibility of many products against one clock reading.
+    Yields each product's result (as check_ntap_eligibility / check_tpt_eligibility) tagged with its index,
+    or {index, error} for a product without a device name or a positive device cost.
+    """
+    check = check_ntap_eligibility if program == "NTAP" else check_tpt_eligibility
+    now = datetime.now()
+    for index, product in enumerate(products):
+        if not product.get("deviceName") or not product.get("deviceCost"):
+            yield {"index": index, "error": "Device name and cost are required"}
+        else:
+            yield {"index": index, **check(product, now=now)}
+
+
+def new_eligibility_summary() -> Dict[str, Any]:
+    """Empty aggregate of screening results, filled by add_to_eligibility_summary"""
     return {
-        "fiscalYear": _tpt_data.get("fiscalYear"),
-        "lastUpdated": _tpt_data.get("lastUpdated"),
-        "maxDuration": _tpt_data.get("maxPassThroughDuration", settings.tpt_max_pass_through_duration),
-        "technologies": _tpt_data.get("technologies"),
-        "totalCount": len(_tpt_data.get("technologies", [])),
+        "totalProducts": 0,
+        "invalid": 0,
+        "byStatus": {status: 0 for status in ELIGIBILITY_STATUSES},
+        "unmetCriteria": {},
+        "totalPotentialPayment": 0,
     }
 
 
+def add_to_eligibility_summary(summary: Dict[str, Any], result: Dict[str, Any]) -> None:
+    """Count one screening result into a summary (potential payments are NTAP add-ons / TPT pass-through amounts)"""
+    summary["totalProducts"] += 1
+    if "error" in result:
+        summary["invalid"] += 1
+        return
+    
+    summary["byStatus"][result["status"]] += 1
+    for criterion in result["eligibilityCriteria"]:
+        if not criterion["met"]:
+            summary["unmetCriteria"][criterion["criterion"]] = summary["unmetCriteria"].get(criterion["criterion"], 0) + 1
+    potential_payment = result.get("potentialPayment") or {}
+    summary["totalPotentialPayment"] += potential_payment.get("ntapPayment", potential_payment.get("passThroughPayment", 0))
+
+
+def screen_portfolio(program: str, products: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Screen a list of products for NTAP or TPT eligibility; per-product results plus an aggregate summary"""
+    summary = new_eligibility_summary()
+    results = []
+    for result in screen_eligibility(program, products):
+        add_to_eligibility_summary(summary, result)
+        results.append(result)
+    return {"program": program, "results": results, "summary": summary}
+
+
+def iter_screen_portfolio(program: str, products: List[Dict[str, Any]], chunk_size: int = 100) -> Iterator[str]:
+    """
+    Stream a portfolio screen as NDJSON: one line per product in input order, then a final {"summary": ...} line.
+    Yields one string per chunk of chunk_size products.
+    """
+    summary = new_eligibility_summary()
+    lines = []
+    for result in screen_eligibility(program, products):
+        add_to_eligibility_summary(summary, result)
+        lines.append(json.dumps(result, separators=(",", ":")))
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    
+    lines.append(json.dumps({"program": program, "summary": summary}, separators=(",", ":")))
+    yield "\n".join(lines) + "\n"
+
+
 # ============================================
 # APPLICATION DOCUMENT GENERATION
 # ============================================
@@ -638,8 +849,7 @@ def _calculate_completion_status(params: Dict[str, Any]) -> Dict[str, Any]:
 
 def get_available_drgs() -> List[Dict[str, Any]]:
     """Get available DRG codes"""
-    _load_data()
-    drg_payments = _ntap_data.get("drgBasePayments", {})
+    drg_payments = reference_data.get_ntap_program().drgBasePayments
     return [
         {"code": code, "payment": payment}
         for code, payment in drg_payments.items()
@@ -648,8 +858,7 @@ def get_available_drgs() -> List[Dict[str, Any]]:
 
 def get_available_apcs() -> List[Dict[str, Any]]:
     """Get available APC codes"""
-    _load_data()
-    apc_payments = _tpt_data.get("apcBasePayments", {})
+    apc_payments = reference_data.get_tpt_program().apcBasePayments
     return [
         {"code": code, "payment": payment}
         for code, payment in apc_payments.items()
@@ -0,0 +1,181 @@
+"""
+Reference Data Store
+Approved NTAP/TPT technologies and program reference data, parsed into typed models once
+and indexed by DRG, APC, procedure code, manufacturer and id for constant-time lookups.
+Also holds the clinical improvement matcher compiled from the category synonyms.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+from app.config import settings
+from app.models.technology import NtapProgram, TptProgram, NtapTechnology, TptTechnology
+from app.services.clinical_matcher import ClinicalImprovementMatcher, load_synonyms
+
+
+Technology = Union[NtapTechnology, TptTechnology]
+
+
+def _get_data_path() -> Path:
+    """Get the path to the data directory"""
+    current_dir = Path(__file__).parent.parent.parent
+    data_dir = current_dir / "data"
+    
+    # If not found, check the original backend's data directory
+    if not data_dir.exists():
+        data_dir = current_dir.parent / "backend" / "data"
+    
+    return data_dir
+
+
+def _code_key(code: Optional[str]) -> str:
+    """Normalize a DRG/APC/procedure code for index lookups"""
+    return code.strip().upper() if code else ""
+
+
+def _manufacturer_key(manufacturer: Optional[str]) -> str:
+    """Normalize a manufacturer name for index lookups (case and whitespace insensitive)"""
+    return " ".join(manufacturer.split()).casefold() if manufacturer else ""
+
+
+def _add(index: Dict[str, List[Technology]], key: str, technology: Technology) -> None:
+    """Append a technology under a key once (source lists may repeat a code)"""
+    if not key:
+        return
+    bucket = index.setdefault(key, [])
+    if not any(entry is technology for entry in bucket):
+        bucket.append(technology)
+
+
+class ReferenceDataStore:
+    """NTAP and TPT programs plus reverse indexes over their technologies"""
+    
+    def __init__(self, data_dir: Optional[Path] = None):
+        self.data_dir = data_dir
+        self.ntap: NtapProgram = NtapProgram()
+        self.tpt: TptProgram = TptProgram()
+        self.by_id: Dict[str, Technology] = {}
+        self.by_drg: Dict[str, Tuple[Technology, ...]] = {}
+        self.by_apc: Dict[str, Tuple[Technology, ...]] = {}
+        self.by_code: Dict[str, Tuple[Technology, ...]] = {}  # indicated procedures and TPT HCPCS codes
+        self.by_manufacturer: Dict[str, Tuple[Technology, ...]] = {}
+        self.clinical_matcher: ClinicalImprovementMatcher = ClinicalImprovementMatcher()
+        self._is_loaded = False
+    
+    def is_ready(self) -> bool:
+        return self._is_loaded
+    
+    def load(self) -> None:
+        """Parse ntap_approved.json and tpt_approved.json and build the indexes (once)"""
+        if self._is_loaded:
+            return
+        
+        data_path = self.data_dir or _get_data_path()
+        with open(data_path / "ntap_approved.json", "r", encoding="utf-8") as f:
+            ntap = NtapProgram.model_validate(json.load(f))
+        with open(data_path / "tpt_approved.json", "r", encoding="utf-8") as f:
+            tpt = TptProgram.model_validate(json.load(f))
+        synonyms_path = Path(settings.clinical_synonyms_path) if settings.clinical_synonyms_path else data_path / "clinical_improvement_synonyms.json"
+        clinical_matcher = ClinicalImprovementMatcher(load_synonyms(synonyms_path))
+        
+        by_id: Dict[str, Technology] = {}
+        by_drg: Dict[str, List[Technology]] = {}
+        by_apc: Dict[str, List[Technology]] = {}
+        by_code: Dict[str, List[Technology]] = {}
+        by_manufacturer: Dict[str, List[Technology]] = {}
+        
+        for technology in ntap.technologies:
+            for drg in technology.applicableDRGs:
+                _add(by_drg, _code_key(drg), technology)
+        for technology in tpt.technologies:
+            for apc in technology.applicableAPCs:
+                _add(by_apc, _code_key(apc), technology)
+            _add(by_code, _code_key(technology.hcpcsCode), technology)
+        for technology in [*ntap.technologies, *tpt.technologies]:
+            by_id.setdefault(technology.id.lower(), technology)
+            for code in technology.indicatedProcedures:
+                _add(by_code, _code_key(code), technology)
+            _add(by_manufacturer, _manufacturer_key(technology.manufacturer), technology)
+        
+        self.ntap = ntap
+        self.tpt = tpt
+        self.by_id = by_id
+        self.by_drg = {key: tuple(bucket) for key, bucket in by_drg.items()}
+        self.by_apc = {key: tuple(bucket) for key, bucket in by_apc.items()}
+        self.by_code = {key: tuple(bucket) for key, bucket in by_code.items()}
+        self.by_manufacturer = {key: tuple(bucket) for key, bucket in by_manufacturer.items()}
+        self.clinical_matcher = clinical_matcher
+        self._is_loaded = True
+        
+        print(f"Reference data loaded: {len(ntap.technologies)} NTAP and {len(tpt.technologies)} TPT technologies")
+    
+    def _ensure_loaded(self) -> "ReferenceDataStore":
+        if not self._is_loaded:
+            self.load()
+        return self
+    
+    def get_ntap_program(self) -> NtapProgram:
+        return self._ensure_loaded().ntap
+    
+    def get_tpt_program(self) -> TptProgram:
+        return self._ensure_loaded().tpt
+    
+    def get_clinical_matcher(self) -> ClinicalImprovementMatcher:
+        return self._ensure_loaded().clinical_matcher
+    
+    def get_technology(self, technology_id: str) -> Optional[Technology]:
+        """Technology by id (e.g. ntap-001)"""
+        return self._ensure_loaded().by_id.get(technology_id.strip().lower() if technology_id else "")
+    
+    def technologies_for_drg(self, drg: str) -> Tuple[Technology, ...]:
+        """NTAP technologies applicable to a DRG"""
+        return self._ensure_loaded().by_drg.get(_code_key(drg), ())
+    
+    def technologies_for_apc(self, apc: str) -> Tuple[Technology, ...]:
+        """TPT technologies applicable to an APC"""
+        return self._ensure_loaded().by_apc.get(_code_key(apc), ())
+    
+    def technologies_for_code(self, code: str) -> Tuple[Technology, ...]:
+        """Technologies indicated for a CPT/HCPCS procedure code (or billed under it, for TPT)"""
+        return self._ensure_loaded().by_code.get(_code_key(code), ())
+    
+    def technologies_for_manufacturer(self, manufacturer: str) -> Tuple[Technology, ...]:
+        """Technologies of a manufacturer"""
+        return self._ensure_loaded().by_manufacturer.get(_manufacturer_key(manufacturer), ())
+    
+    @staticmethod
+    def program_of(technology: Technology) -> str:
+        return "NTAP" if isinstance(technology, NtapTechnology) else "TPT"
+    
+    @classmethod
+    def to_response(cls, technology: Technology) -> Dict[str, Any]:
+        """A technology as published, tagged with its program"""
+        return {"program": cls.program_of(technology), **technology.model_dump(exclude_unset=True)}
+    
+    @classmethod
+    def to_reference(cls, technology: Technology) -> Dict[str, Any]:
+        """Short form used to annotate calculator and chat responses"""
+        return {
+            "id": technology.id,
+            "program": cls.program_of(technology),
+            "name": technology.name,
+            "manufacturer": technology.manufacturer,
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reference data statistics"""
+        return {
+            "loaded": self._is_loaded,
+            "ntapTechnologies": len(self.ntap.technologies),
+            "tptTechnologies": len(self.tpt.technologies),
+            "drgs": len(self.by_drg),
+            "apcs": len(self.by_apc),
+            "codes": len(self.by_code),
+            "manufacturers": len(self.by_manufacturer),
+            "clinicalMatcher": self.clinical_matcher.get_stats(),
+        }
+
+
+# Singleton instance
+reference_data = ReferenceDataStore()
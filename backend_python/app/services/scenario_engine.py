@@ -0,0 +1,279 @@
+"""
+Scenario Engine
+Evaluates many reimbursement scenarios at once against a catalog's payment table.
+
+Scenarios are validated row by row (with the same messages as ReimbursementScenario.validate),
+their codes are resolved once per distinct code, and payments, margins and classifications are
+computed in NumPy passes over the whole batch. Results are returned as columns, one list per field,
+or streamed as NDJSON rows by iter_scenarios.
+"""
+
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.models import ReimbursementScenario, Classification, SITES_OF_SERVICE
+from app.services.code_payments import PAYMENT_SITES
+from app.services.code_service import CodeService
+
+
+SITE_COLUMNS = {site: column for column, site in enumerate(PAYMENT_SITES)}
+CLASSIFICATIONS = [Classification.PROFITABLE.value, Classification.BREAK_EVEN.value, Classification.LOSS.value]
+
+
+def classify_margins(margin: np.ndarray, total_payment: np.ndarray) -> np.ndarray:
+    """Vectorized ReimbursementScenario._classify_margin: indexes into CLASSIFICATIONS"""
+    ratio = np.divide(margin, total_payment, out=np.zeros_like(margin), where=total_payment != 0)
+    return np.select(
+        [
+            (total_payment == 0) & (margin >= 0),
+            total_payment == 0,
+            ratio >= settings.profitable_min_margin,
+            ratio >= settings.break_even_min_margin,
+        ],
+        [1, 2, 0, 1],
+        default=2,
+    )
+
+
+def cutover_costs(total_payment: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Highest device cost at which margin / total payment still reaches threshold, per payment.
+    Starts from the analytic bound total * (1 - threshold) and steps it by single ulps until it
+    agrees with the floating-point ratio the classification uses. NaN where no cost >= 0 qualifies
+    (including zero or negative totals, which classify_margins handles separately).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cost = total_payment * (1 - threshold)
+        for _ in range(4):
+            too_high = (total_payment - cost) / total_payment < threshold
+            cost = np.where(too_high, np.nextafter(cost, -np.inf), cost)
+            higher = np.nextafter(cost, np.inf)
+            can_rise = ~too_high & ((total_payment - higher) / total_payment >= threshold)
+            cost = np.where(can_rise, higher, cost)
+        return np.where((total_payment > 0) & (cost >= 0), cost, np.nan)
+
+
+def _with_gaps(values: List[Any], valid: List[bool]) -> List[Any]:
+    """Blank out the values of rows that were not evaluated"""
+    return [value if ok else None for value, ok in zip(values, valid)]
+
+
+def evaluate_scenarios(
+    code_service: CodeService,
+    codes: List[str],
+    sites: List[str],
+    device_costs: List[float],
+    ntap_add_ons: List[float],
+    include_breakdown: bool = False
+) -> Dict[str, Any]:
+    """
+    Evaluate scenarios given as parallel lists (one entry per scenario) against a CodeService's catalog.
+    Invalid scenarios and unknown codes are reported in errors (by row index) and left as None in the columns.
+    """
+    count = len(codes)
+    errors: List[Dict[str, Any]] = []
+    site_infos: Dict[str, Optional[Dict[str, str]]] = {}
+    code_slots: Dict[str, int] = {}
+    row_sites: List[Optional[Dict[str, str]]] = []
+    row_slots: List[int] = []
+    valid: List[bool] = []
+    
+    # Validate rows and collect the distinct codes to resolve
+    for row in range(count):
+        site = sites[row]
+        if site not in site_infos:
+            site_infos[site] = ReimbursementScenario.normalize_site(site)
+        site_info = site_infos[site]
+        ok = bool(codes[row]) and site_info is not None and device_costs[row] >= 0 and ntap_add_ons[row] >= 0
+        if not ok:
+            scenario = ReimbursementScenario(codes[row], site, device_costs[row], ntap_add_ons[row])
+            errors.append({"index": row, "errors": scenario.validate()["errors"]})
+        
+        row_sites.append(site_info)
+        row_slots.append(code_slots.setdefault(codes[row], len(code_slots)) if ok else 0)
+        valid.append(ok)
+    
+    resolved, payments = code_service.get_payment_rows(list(code_slots))
+    for row in range(count):
+        if valid[row] and resolved[row_slots[row]] is None:
+            errors.append({"index": row, "errors": [f"Code not found: {codes[row]}"]})
+            valid[row] = False
+    errors.sort(key=lambda error: error["index"])
+    
+    # Payments, margins and classifications for every row at once
+    site_columns = np.array([SITE_COLUMNS[info["key"]] if info else 0 for info in row_sites], dtype=np.intp)
+    slots = np.array(row_slots, dtype=np.intp)
+    base_payment = payments[slots, site_columns] if len(code_slots) else np.zeros(count, dtype=np.int64)
+    add_on_payment = np.maximum(0, np.array(ntap_add_ons, dtype=np.float64))
+    device_cost = np.array(device_costs, dtype=np.float64)
+    total_payment = base_payment + add_on_payment
+    margin = total_payment - device_cost
+    margin_percentage = np.divide(margin, total_payment, out=np.zeros(count), where=total_payment > 0) * 100
+    classification = classify_margins(margin, total_payment)
+    
+    base_values = base_payment.tolist()
+    add_on_values = add_on_payment.tolist()
+    total_values = total_payment.tolist()
+    margin_values = margin.tolist()
+    catalog_codes = [resolved[slot] if ok else code for slot, ok, code in zip(row_slots, valid, codes)]
+    
+    result = {
+        "count": count,
+        "evaluated": sum(valid),
+        "columns": {
+            "code": catalog_codes,
+            "siteKey": [info["key"] if info else None for info in row_sites],
+            "basePayment": _with_gaps(base_values, valid),
+            "addOnPayment": _with_gaps(add_on_values, valid),
+            "totalPayment": _with_gaps(total_values, valid),
+            "deviceCost": list(device_costs),
+            "margin": _with_gaps(margin_values, valid),
+            # Same one-decimal string as the single /scenario response
+            "marginPercentage": _with_gaps([f"{value:.1f}" for value in margin_percentage.tolist()], valid),
+            "classification": _with_gaps([CLASSIFICATIONS[index] for index in classification.tolist()], valid),
+        },
+        "errors": errors,
+    }
+    
+    if include_breakdown:
+        result["breakdown"] = [_row_breakdown(result["columns"], row_sites, row) if valid[row] else None for row in range(count)]
+    
+    return result
+
+
+def _row_breakdown(columns: Dict[str, List[Any]], row_sites: List[Optional[Dict[str, str]]], row: int) -> Dict[str, Dict[str, Any]]:
+    """Labelled payment breakdown of one evaluated row"""
+    return ReimbursementScenario.build_breakdown(
+        columns["code"][row],
+        row_sites[row]["name"],
+        columns["basePayment"][row],
+        columns["addOnPayment"][row],
+        columns["totalPayment"][row],
+        columns["deviceCost"][row],
+        columns["margin"][row],
+    )
+
+
+def iter_scenarios(
+    code_service: CodeService,
+    codes: List[str],
+    sites: List[str],
+    device_costs: List[float],
+    ntap_add_ons: List[float],
+    include_breakdown: bool = False,
+    chunk_size: int = 1000
+) -> Iterator[str]:
+    """
+    Evaluate scenarios like evaluate_scenarios and stream them as NDJSON, one object per scenario in input order:
+    {index, code, siteKey, ..., classification} plus breakdown when requested, or {index, code, errors} if not evaluated.
+    Yields one string per chunk of chunk_size rows; breakdowns are built row by row as their chunk is written.
+    """
+    result = evaluate_scenarios(code_service, codes, sites, device_costs, ntap_add_ons)
+    columns = result["columns"]
+    fields = list(columns)
+    row_errors = {error["index"]: error["errors"] for error in result["errors"]}
+    row_sites = [ReimbursementScenario.normalize_site(site) for site in sites] if include_breakdown else []
+    
+    lines = []
+    for row in range(result["count"]):
+        errors = row_errors.get(row)
+        if errors is not None:
+            entry = {"index": row, "code": columns["code"][row], "errors": errors}
+        else:
+            entry = {"index": row}
+            for field in fields:
+                entry[field] = columns[field][row]
+            if include_breakdown:
+                entry["breakdown"] = _row_breakdown(columns, row_sites, row)
+        lines.append(json.dumps(entry, separators=(",", ":")))
+        
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def _cost_or_none(cost: float) -> Optional[float]:
+    """A cutover cost, or None for NaN (no device cost qualifies)"""
+    return None if cost != cost else cost
+
+
+def sweep_device_costs(
+    code_service: CodeService,
+    codes: List[str],
+    ntap_add_on: float = 0,
+    min_cost: float = 0,
+    max_cost: float = 0,
+    samples: int = 0
+) -> Dict[str, Any]:
+    """
+    Device-cost sensitivity per code and site of service: the highest cost that is still profitable
+    (profitableMaxCost) and still at least break-even (breakEvenMaxCost), derived from the settings
+    thresholds, plus an optional margin curve sampled at `samples` costs from min_cost to max_cost.
+    """
+    requested = list(dict.fromkeys(code.strip() for code in codes if code and code.strip()))
+    resolved, payments = code_service.get_payment_rows(requested)
+    
+    found: Dict[str, int] = {}  # catalog code -> row, so case variants are swept once
+    not_found = []
+    for row, (code, catalog_code) in enumerate(zip(requested, resolved)):
+        if catalog_code is None:
+            not_found.append(code)
+        else:
+            found.setdefault(catalog_code, row)
+    
+    rows = np.array(list(found.values()), dtype=np.intp)
+    base_payment = payments[rows]
+    total_payment = base_payment + max(0, ntap_add_on)
+    profitable_max = cutover_costs(total_payment, settings.profitable_min_margin)
+    break_even_max = cutover_costs(total_payment, settings.break_even_min_margin)
+    # A zero total is break-even at no device cost and a loss above it
+    break_even_max = np.where(total_payment == 0, 0.0, break_even_max)
+    
+    costs = np.linspace(min_cost, max_cost, samples) if samples else None
+    if costs is not None:
+        margins = total_payment[:, :, None] - costs
+        classes = classify_margins(margins, np.broadcast_to(total_payment[:, :, None], margins.shape))
+    
+    base_values = base_payment.tolist()
+    total_values = total_payment.tolist()
+    profitable_values = profitable_max.tolist()
+    break_even_values = break_even_max.tolist()
+    
+    results = []
+    for index, catalog_code in enumerate(found):
+        sites = []
+        for column, site in enumerate(PAYMENT_SITES):
+            entry = {
+                "siteKey": site,
+                "site": SITES_OF_SERVICE[site]["name"],
+                "basePayment": base_values[index][column],
+                "totalPayment": total_values[index][column],
+                "profitableMaxCost": _cost_or_none(profitable_values[index][column]),
+                "breakEvenMaxCost": _cost_or_none(break_even_values[index][column]),
+            }
+            if costs is not None:
+                entry["curve"] = {
+                    "margin": margins[index, column].tolist(),
+                    "classification": [CLASSIFICATIONS[value] for value in classes[index, column].tolist()],
+                }
+            sites.append(entry)
+        results.append({"code": catalog_code, "sites": sites})
+    
+    response = {
+        "ntapAddOn": ntap_add_on,
+        "thresholds": {
+            "profitableMinMargin": settings.profitable_min_margin,
+            "breakEvenMinMargin": settings.break_even_min_margin,
+        },
+        "results": results,
+        "notFound": not_found,
+    }
+    if costs is not None:
+        response["costs"] = costs.tolist()
+    return response
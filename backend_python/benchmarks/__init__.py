@@ -0,0 +1 @@
+# Performance benchmarks (run from backend_python/, e.g. python -m benchmarks.search_latency)
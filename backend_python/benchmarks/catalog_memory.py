@@ -0,0 +1,62 @@
+"""
+Catalog memory benchmark: list of record dicts vs the compact columnar store
+Usage: python -m benchmarks.catalog_memory [--samples 500] [--seed 7]
+"""
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+from benchmarks.common import load_catalog, service_for, percentile, timed
+
+
+def measure(storage_mode: str):
+    """Load a catalog under tracemalloc; returns (catalog, retained MB, peak MB)"""
+    gc.collect()
+    tracemalloc.start()
+    catalog = load_catalog(storage_mode)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return catalog, current / 1024 / 1024, peak / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    dict_catalog, dict_mb, dict_peak = measure("dict")
+    compact_catalog, compact_mb, compact_peak = measure("compact")
+    dict_service = service_for(dict_catalog)
+    compact_service = service_for(compact_catalog)
+    
+    rng = random.Random(args.seed)
+    sample = [rng.choice(dict_catalog.codes) for _ in range(args.samples)]
+    queries = [code_obj["description"].split()[0] for code_obj in sample[:50] if code_obj.get("description")]
+    
+    dict_times, compact_times, mismatches = [], [], 0
+    for code_obj in sample:
+        dict_result, dict_ms = timed(dict_service.get_code, code_obj["code"])
+        compact_result, compact_ms = timed(compact_service.get_code, code_obj["code"])
+        dict_times.append(dict_ms)
+        compact_times.append(compact_ms)
+        if json.dumps(dict_result, sort_keys=True) != json.dumps(compact_result, sort_keys=True):
+            mismatches += 1
+    for query in queries:
+        if dict_service.search_codes(query) != compact_service.search_codes(query):
+            mismatches += 1
+    
+    checks = len(sample) + len(queries)
+    print(f"\nCatalog: {len(dict_catalog.codes)} codes")
+    print(f"{'':10}{'retained (MB)':>15}{'peak (MB)':>12}{'get_code p50 (ms)':>20}")
+    print(f"{'dict':10}{dict_mb:15.1f}{dict_peak:12.1f}{percentile(dict_times, 50):20.3f}")
+    print(f"{'compact':10}{compact_mb:15.1f}{compact_peak:12.1f}{percentile(compact_times, 50):20.3f}")
+    print(f"Identical results: {checks - mismatches}/{checks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Shared helpers for the benchmarks
+"""
+
+import json
+import time
+from typing import List, Dict, Any
+
+from app.services import CodeService
+from app.services.code_catalog import CodeCatalog
+from app.services.code_store import CompactCodeStore
+
+
+def load_catalog(storage_mode: str = "dict") -> CodeCatalog:
+    """Parse every chunk listed in the manifest that is present on disk and build indexes"""
+    service = CodeService()
+    chunks_dir = service._get_data_path() / "codes_chunks"
+    with open(chunks_dir / "manifest.json", "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    
+    codes: List[Dict[str, Any]] = []
+    for chunk in manifest["chunks"]:
+        chunk_path = chunks_dir / chunk["fileName"]
+        if not chunk_path.exists():
+            print(f"  (skipping missing {chunk['fileName']})")
+            continue
+        with open(chunk_path, "r", encoding="utf-8") as f:
+            codes.extend(json.load(f))
+    
+    catalog = CodeCatalog(codes=codes, manifest=manifest)
+    if storage_mode == "compact":
+        catalog.codes = CompactCodeStore.from_records(codes)
+        del codes
+    catalog.build_indexes()
+    return catalog
+
+
+def service_for(catalog: CodeCatalog) -> CodeService:
+    """Create a ready CodeService around an already built catalog"""
+    service = CodeService()
+    service.catalog = catalog
+    service._is_loaded = True
+    return service
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn and return (result, elapsed milliseconds)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
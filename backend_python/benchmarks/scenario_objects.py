@@ -0,0 +1,202 @@
+"""
+Scenario object benchmark: per-scenario cost of ReimbursementScenario vs the original class
+(instance dicts, regex site normalization on every call, breakdown always built)
+Usage: python -m benchmarks.scenario_objects [--scenarios 20000] [--seed 7]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.models import ReimbursementScenario, SITES_OF_SERVICE
+from app.models.reimbursement import SITE_MAPPING, Classification
+
+
+class LegacyScenario:
+    """ReimbursementScenario as it was before __slots__ and the site lookup table"""
+    
+    def __init__(self, code: str, site_of_service: str, device_cost: float, ntap_add_on: float = 0, code_detail=None):
+        self.code = code
+        self.site_of_service = site_of_service
+        self.device_cost = device_cost
+        self.ntap_add_on = ntap_add_on
+        self.code_detail = code_detail
+        self._site_info = None
+        self._results = None
+    
+    def _normalize_site(self, site: str) -> Optional[Dict[str, str]]:
+        if not site:
+            return None
+        key = re.sub(r'[^A-Z]', '', site.upper())
+        return SITE_MAPPING.get(key)
+    
+    @property
+    def site_info(self) -> Optional[Dict[str, str]]:
+        if self._site_info is None:
+            self._site_info = self._normalize_site(self.site_of_service)
+        return self._site_info
+    
+    def validate(self) -> Dict[str, Any]:
+        errors = []
+        if not self.code or not isinstance(self.code, str):
+            errors.append("Code is required and must be a string")
+        if not self.site_of_service or not isinstance(self.site_of_service, str):
+            errors.append("Site of service is required and must be a string")
+        elif not self._normalize_site(self.site_of_service):
+            valid_sites = ", ".join(SITES_OF_SERVICE.keys())
+            errors.append(f"Invalid site of service: {self.site_of_service}. Valid options: {valid_sites}")
+        if self.device_cost is None:
+            errors.append("Device cost is required")
+        elif not isinstance(self.device_cost, (int, float)) or self.device_cost < 0:
+            errors.append("Device cost must be a non-negative number")
+        if self.ntap_add_on is not None:
+            if not isinstance(self.ntap_add_on, (int, float)) or self.ntap_add_on < 0:
+                errors.append("NTAP add-on must be a non-negative number")
+        return {"valid": len(errors) == 0, "errors": errors}
+    
+    def _classify_margin(self, margin: float, total_payment: float) -> str:
+        if total_payment == 0:
+            return Classification.BREAK_EVEN if margin >= 0 else Classification.LOSS
+        margin_ratio = margin / total_payment
+        if margin_ratio >= settings.profitable_min_margin:
+            return Classification.PROFITABLE
+        if margin_ratio >= settings.break_even_min_margin:
+            return Classification.BREAK_EVEN
+        return Classification.LOSS
+    
+    def calculate(self, code_detail: Dict[str, Any]) -> Dict[str, Any]:
+        self.code_detail = code_detail
+        if not self.site_info:
+            raise ValueError(f"Invalid site of service: {self.site_of_service}")
+        base_payment = code_detail.get("payments", {}).get(self.site_info["key"], 0)
+        add_on_payment = max(0, self.ntap_add_on)
+        total_payment = base_payment + add_on_payment
+        margin = total_payment - self.device_cost
+        self._results = {
+            "base_payment": base_payment,
+            "add_on_payment": add_on_payment,
+            "total_payment": total_payment,
+            "margin": margin,
+            "margin_percentage": ((margin / total_payment) * 100) if total_payment > 0 else 0,
+            "classification": self._classify_margin(margin, total_payment),
+        }
+        return self._results
+    
+    def to_response(self) -> Dict[str, Any]:
+        if not self._results or not self.code_detail:
+            raise ValueError("Scenario must be calculated before converting to response")
+        results = self._results
+        return {
+            "code": self.code_detail.get("code"),
+            "description": self.code_detail.get("description"),
+            "siteOfService": self.site_info["name"],
+            "siteKey": self.site_info["key"],
+            "basePayment": results["base_payment"],
+            "addOnPayment": results["add_on_payment"],
+            "totalPayment": results["total_payment"],
+            "deviceCost": self.device_cost,
+            "margin": results["margin"],
+            "marginPercentage": f"{results['margin_percentage']:.1f}",
+            "classification": results["classification"],
+            "breakdown": ReimbursementScenario.build_breakdown(
+                self.code_detail.get("code"),
+                self.site_info["name"],
+                results["base_payment"],
+                results["add_on_payment"],
+                results["total_payment"],
+                self.device_cost,
+                results["margin"],
+            ),
+            "codeDetails": {
+                "type": self.code_detail.get("type"),
+                "category": self.code_detail.get("category"),
+                "allPayments": self.code_detail.get("payments"),
+                "apc": self.code_detail.get("optional", {}).get("apc"),
+            },
+        }
+
+
+def sample_scenarios(count: int, rng: random.Random) -> List[tuple]:
+    """(code detail, site input, device cost, NTAP add-on) tuples with realistic site spellings"""
+    sites = ["HOPD", "hopd", "Ambulatory", "ASC", "asc", "Office", "OBL", "Inpatient", "IPPS", "opps"]
+    details = [
+        {
+            "code": f"{33000 + i}",
+            "description": "Transcatheter procedure",
+            "type": "CPT",
+            "category": "Cardiovascular System",
+            "payments": {"IPPS": rng.randint(0, 30000), "HOPD": rng.randint(0, 20000), "ASC": rng.randint(0, 13000), "OBL": rng.randint(0, 2000)},
+            "optional": {"apc": "5193"},
+        }
+        for i in range(200)
+    ]
+    return [
+        (rng.choice(details), rng.choice(sites), round(rng.random() * 20000, 2), rng.choice([0, 0, 2500.0]))
+        for _ in range(count)
+    ]
+
+
+def run(scenario_class, scenarios: List[tuple], **response_kwargs) -> List[Dict[str, Any]]:
+    """Construct, validate, calculate and render every scenario"""
+    responses = []
+    for detail, site, cost, ntap in scenarios:
+        scenario = scenario_class(detail["code"], site, cost, ntap)
+        scenario.validate()
+        scenario.calculate(detail)
+        responses.append(scenario.to_response(**response_kwargs))
+    return responses
+
+
+def per_scenario(fn, scenarios: List[tuple], repeats: int, **kwargs) -> tuple:
+    """Best-of-repeats microseconds per scenario, and bytes allocated per scenario (retained responses)"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(scenarios=scenarios, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    
+    tracemalloc.start()
+    responses = fn(scenarios=scenarios, **kwargs)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del responses
+    return best / len(scenarios) * 1e6, retained / len(scenarios)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    scenarios = sample_scenarios(args.scenarios, random.Random(args.seed))
+    legacy = lambda scenarios: run(LegacyScenario, scenarios)
+    current = lambda scenarios, **kwargs: run(ReimbursementScenario, scenarios, **kwargs)
+    
+    rows = [
+        ("original class", *per_scenario(legacy, scenarios, args.repeats)),
+        ("slotted", *per_scenario(current, scenarios, args.repeats)),
+    ]
+    if "include_breakdown" in ReimbursementScenario.to_response.__code__.co_varnames:
+        rows.append(("slotted, no breakdown", *per_scenario(current, scenarios, args.repeats, include_breakdown=False)))
+    
+    detail, site, cost, ntap = scenarios[0]
+    print(f"\n{len(scenarios)} scenarios, best of {args.repeats}")
+    print(f"Instance size: original {sys.getsizeof(LegacyScenario('X', site, cost)) + sys.getsizeof(LegacyScenario('X', site, cost).__dict__)} B, "
+          f"current {sys.getsizeof(ReimbursementScenario('X', site, cost)) + sys.getsizeof(getattr(ReimbursementScenario('X', site, cost), '__dict__', {}))} B")
+    print(f"{'':24}{'us/scenario':>14}{'bytes/response':>16}")
+    for label, micros, size in rows:
+        print(f"{label:24}{micros:14.2f}{size:16.0f}")
+    
+    same = run(LegacyScenario, scenarios[:500]) == run(ReimbursementScenario, scenarios[:500])
+    print(f"Identical responses: {same}")
+
+
+if __name__ == "__main__":
+    main()
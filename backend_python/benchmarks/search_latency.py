@@ -0,0 +1,99 @@
+"""
+Search latency benchmark: inverted token index vs the original linear scan
+Usage: python -m benchmarks.search_latency [--queries 200] [--seed 7]
+"""
+
+import argparse
+import random
+from typing import List, Dict, Any, Optional
+
+from benchmarks.common import load_catalog, service_for, percentile, timed
+
+
+def build_scan_index(codes: List[Dict[str, Any]], normalize) -> List[Dict[str, Any]]:
+    """The search index as it was before the inverted index (one dict per code)"""
+    return [
+        {
+            "code": code_obj["code"],
+            "search_text": f"{code_obj['code']} {code_obj.get('description', '')}".lower(),
+            "type": normalize(code_obj.get("type")),
+        }
+        for code_obj in codes
+    ]
+
+
+def scan_search(scan_index: List[Dict[str, Any]], query: str, limit: int = 50, code_type: Optional[str] = None):
+    """The original O(N x terms) scoring loop; returns (total, top codes)"""
+    search_term = query.lower().strip()
+    terms = search_term.split()
+    results = []
+    
+    for item in scan_index:
+        if code_type and item["type"] != code_type.upper():
+            continue
+        score = 0
+        if item["code"].lower() == search_term:
+            score = 100
+        elif search_term in item["code"].lower():
+            score = 80
+        for term in terms:
+            if term in item["search_text"]:
+                score += 10
+        if score > 0:
+            results.append({"code": item["code"], "score": score})
+    
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return len(results), [r["code"] for r in results[:limit]]
+
+
+def sample_queries(codes: List[Dict[str, Any]], count: int, rng: random.Random) -> List[str]:
+    """Mix of exact codes, code prefixes, whole words, partial words and multi-word queries"""
+    queries = []
+    for i in range(count):
+        code_obj = rng.choice(codes)
+        words = [w for w in str(code_obj.get("description", "")).split() if len(w) > 3] or [code_obj["code"]]
+        kind = i % 5
+        if kind == 0:
+            queries.append(code_obj["code"])
+        elif kind == 1:
+            queries.append(code_obj["code"][:3])
+        elif kind == 2:
+            queries.append(rng.choice(words))
+        elif kind == 3:
+            word = rng.choice(words)
+            queries.append(word[: max(2, len(word) // 2)])
+        else:
+            queries.append(" ".join(rng.sample(words, min(2, len(words)))))
+    return queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    catalog = load_catalog()
+    service = service_for(catalog)
+    scan_index = build_scan_index(catalog.codes, service._normalize_type)
+    queries = sample_queries(catalog.codes, args.queries, random.Random(args.seed))
+    
+    scan_times, index_times, mismatches = [], [], 0
+    for query in queries:
+        (scan_total, scan_codes), scan_ms = timed(scan_search, scan_index, query)
+        result, index_ms = timed(service.search_codes, query)
+        scan_times.append(scan_ms)
+        index_times.append(index_ms)
+        if scan_total != result["total"] or scan_codes != [c["code"] for c in result["codes"]]:
+            mismatches += 1
+            print(f"  MISMATCH for {query!r}: scan={scan_total} index={result['total']}")
+    
+    print(f"\nCatalog: {len(catalog.codes)} codes, {len(queries)} queries")
+    print(f"{'':14}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    print(f"{'linear scan':14}{percentile(scan_times, 50):12.2f}{percentile(scan_times, 99):12.2f}")
+    print(f"{'token index':14}{percentile(index_times, 50):12.2f}{percentile(index_times, 99):12.2f}")
+    print(f"Identical results: {len(queries) - mismatches}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()